@@ -12,21 +12,11 @@ import matplotlib.cm as cm
 from matplotlib.colors import Normalize
 from matplotlib.collections import LineCollection
 import numpy as np
-import fredpy as fp
+import fred_cache
 import subprocess
 import pandas as pd
 import os
-
-
-# In[2]:
-
-
-# Make directories for output if they don't exist
-if not os.path.isdir('../video'):
-    os.mkdir('../video')
-
-if not os.path.isdir('../image'):
-    os.mkdir('../image')
+import renderer
 
 
 # In[3]:
@@ -42,7 +32,7 @@ ratio = main_height/main_width
 
 
 # --- data prep ---
-data = fp.series('PCEPI').data
+data = fred_cache.series('PCEPI').data
 data = data/data.shift() - 1
 data = data.dropna()
 scale = 0.05
@@ -97,61 +87,76 @@ fig = plt.figure(figsize=(12, 12*ratio), facecolor='black')
 # set the axes to cover the full figure and start with a black background
 ax = fig.add_axes([0, 0, 1, 1], facecolor='black')
 
-# initial static background plot (optional; update_plot will re‑draw it)
+# Length of the colored window
+length = 100
+
+# Background line and a single LineCollection, created once. update_plot only changes the collection's segments,
+# colors and color limits, so the axes are never cleared and rebuilt
 ax.plot(data.x,data.y, color='#1f77b4', linewidth=0.75, alpha=0.25)
+ax.set_xlim([0, main_width])
+ax.set_ylim([0, main_height])
 ax.axis('off')
 
+lc = LineCollection([], cmap='hot', linewidth=2)
+lc.set_visible(False)
+ax.add_collection(lc)
+
 # Pre‐set the figure‐level rcParam so savefig uses black by default
 plt.rcParams['savefig.facecolor'] = 'black'
 
+# Precompute the windows. Frame i shows rows i-first_frame to i-first_frame+length of data. Repeating the last point
+# keeps every window full length. The windows that run past the end of data were shorter before, but they lie in the
+# constant padding, so the extra points only add zero-length segments
+x = data['x'].values
+y = data['y'].values
+n_rows = max(len(x), n_frames-first_frame-1+length)
+x = np.pad(x,(0,n_rows-len(x)),mode='edge')
+y = np.pad(y,(0,n_rows-len(y)),mode='edge')
+
+# Segments between consecutive points with shape (n_rows-1, 2, 2) and zero-copy sliding-window views over them
+points = np.stack([x, y], axis=1)
+segments = np.stack([points[:-1], points[1:]], axis=1)
+segment_windows = np.lib.stride_tricks.sliding_window_view(segments,length-1,axis=0).transpose(0,3,1,2)
+x_windows = np.lib.stride_tricks.sliding_window_view(x,length)
+x_min = x_windows.min(axis=1)
+x_max = x_windows.max(axis=1)
+
 def update_plot(i):
-    ax.cla()                      # clear everything
-    ax.set_facecolor('black')     # restore black background
 
-    # re‑draw your data
-    ax.plot(data.x,data.y, color='#1f77b4', linewidth=0.75, alpha=0.25)
+    if i>=first_frame:
+        start = i-first_frame
 
-    # fix your limits
-    ax.set_xlim([0, main_width])
-    ax.set_ylim([0, main_height])
+        # color the window by x, normalized to the window's own x range
+        lc.set_segments(segment_windows[start])
+        lc.set_array(x_windows[start])
+        lc.set_clim(x_min[start], x_max[start])
+        lc.set_visible(True)
 
-    # remove ticks/labels/spines
-    ax.axis('off')
+    else:
+        lc.set_visible(False)
 
-    # print(i)
+    return lc,
 
-    if i>=first_frame:
-        start = i + (200-first_frame)
-        start=i-60
-        length = 100
-        segment = data.iloc[start:start+length]
-        
-        # correct 1-D x & y arrays
-        x_seg = segment['x'].values
-        y_seg = segment['y'].values
-        
-        # build and add the colored line
-        pts  = np.stack([x_seg, y_seg], axis=1).reshape(-1,1,2)
-        segs = np.concatenate([pts[:-1], pts[1:]], axis=1)
-        norm = Normalize(vmin=x_seg.min(), vmax=x_seg.max())
-        lc   = LineCollection(segs, cmap='hot', norm=norm, linewidth=2)
-        lc.set_array(x_seg)
-        ax.add_collection(lc)
-
-        if start==462+200:
-            fig.savefig('../image/banner_thumbnail.png',dpi=526,transparent=False)
-
-    # no need to return anything when blit=False
-    return
-
-# Set up the ffmpeg writer
-Writer = animation.writers['ffmpeg']
-writer = Writer(fps=fps, metadata=dict(artist='You'), bitrate=5000)
-
-ani = animation.FuncAnimation(
-    fig, update_plot, frames=n_frames, blit=False, repeat=False, interval=20
-)
+frames = range(n_frames)
+
+
+if __name__ == '__main__':
+
+    # Make directories for output if they don't exist
+    if not os.path.isdir('../video'):
+        os.mkdir('../video')
+
+    if not os.path.isdir('../image'):
+        os.mkdir('../image')
+
+    # Set up the ffmpeg writer
+    Writer = animation.writers['ffmpeg']
+    writer = Writer(fps=fps, metadata=dict(artist='You'), bitrate=5000)
 
-# When saving, the figure and axes are already black:
-ani.save('../video/vimeo_banner_video.mp4', writer=writer)
+    # Render the frames in parallel. When saving, the figure and axes are already black. Segments are cached in
+    # ../video/.render-cache, so an interrupted run picks up where it stopped
+    renderer.render(fig, update_plot, frames, '../video/vimeo_banner_video.mp4', writer, cache=True, segment=200)
 
+    # Thumbnail from the frame whose window starts at index 462+200 of the padded data
+    update_plot(462+200+first_frame)
+    fig.savefig('../image/banner_thumbnail.png',dpi=526,transparent=False)
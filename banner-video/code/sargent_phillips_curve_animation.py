@@ -11,7 +11,9 @@ import matplotlib.animation as animation
 import matplotlib.cm as cm
 import numpy as np
 import fredpy as fp
+import fred_cache
 import subprocess
+import renderer
 import os
 
 plt.style.use('classic')
@@ -26,9 +28,9 @@ main_width = 16
 main_height = 9
 ratio = main_height/main_width
 
-# Dowload data
-u = fp.series('LNS14000028')
-p = fp.series('CPIAUCSL')
+# Download data, or read it from the cache in ../.fred-cache when it was downloaded less than a day ago
+u = fred_cache.series('LNS14000028')
+p = fred_cache.series('CPIAUCSL')
 
 # Construct the inflation series
 p = p.pc(annualized=True)
@@ -80,47 +82,63 @@ fig.tight_layout()
 # In[4]:
 
 
+# All points in one PathCollection. Offsets, edge colors and sizes are preallocated and update_plot shows the first
+# i+1 points by passing slices of them, so each frame draws one artist instead of one artist per period
+offsets = np.column_stack([u.values,p.values])
+edgecolors = np.array(colors)
+sizes = np.full(n,13.0**2)
+scatter = ax.scatter([],[],marker='o',facecolors='none',linewidths=2,alpha=0.9)
+
+# Function for updating the plot with new data points
 def update_plot(i):
 
-    scatter = ax.plot(u.iloc[i],p.iloc[i],'o',fillstyle='none',alpha=0.9,markeredgecolor=colors[i], markeredgewidth=2,markersize=13)
+    scatter.set_offsets(offsets[:i+1])
+    scatter.set_edgecolors(edgecolors[:i+1])
+    scatter.set_sizes(sizes[:i+1])
     text.set_text(years[i])
 
     return scatter, text
 
+# One frame per period
+frames = range(n)
+
+# Frame i shows points 0 through i in their colors, so each key chains the point and color of period i to the key
+# of the period before. The colormap spans the whole sample, so a new period changes every key and the movie is
+# rendered in full; with unchanged data a rerun renders nothing
+keys = renderer.chain_keys(offsets, edgecolors, years)
+
 
 # In[5]:
 
 
-# Make directories for output if they don't exist
-if not os.path.isdir('../video'):
-    os.mkdir('../video')
+if __name__ == '__main__':
 
-if not os.path.isdir('../image'):
-    os.mkdir('../image')
+    # Make directories for output if they don't exist
+    if not os.path.isdir('../video'):
+        os.mkdir('../video')
 
+    if not os.path.isdir('../image'):
+        os.mkdir('../image')
 
-# In[6]:
 
+    # In[6]:
 
-# Set up formatting for the movie files
-Writer = animation.writers['ffmpeg']
-writer = Writer(fps=10, metadata=dict(artist='Brian C Jenkins'), bitrate=5000)
 
-# Make the animation
-ani = animation.FuncAnimation(fig, update_plot, frames = n,fargs = (), blit=False,repeat=False,interval=20)
+    # Set up formatting for the movie files
+    Writer = animation.writers['ffmpeg']
+    writer = Writer(fps=10, metadata=dict(artist='Brian C Jenkins'), bitrate=5000)
 
-# Save the animation as .mp4
-# ani.save('../video/US_Inflation_Unemployment_Monthly_BP_Filtered.ogv',fps=10,codec='libtheora')
-ani.save('../video/us_inflation_unemployment_monthly_bp_filtered.mp4',writer=writer)
+    # Render the frames in parallel and save the animation as .mp4
+    renderer.render_appending(fig, update_plot, frames, keys, '../video/us_inflation_unemployment_monthly_bp_filtered.mp4', writer, cache=True)
 
-# Save the final image of the animation to use as the still image placeholder
-plt.savefig('../image/us_inflation_unemployment_monthly_bp_filtered.png',bbox_inches='tight',dpi=120)
+    # Save the final image of the animation to use as the still image placeholder
+    update_plot(n-1)
+    plt.savefig('../image/us_inflation_unemployment_monthly_bp_filtered.png',bbox_inches='tight',dpi=120)
 
 
-# In[7]:
+    # In[7]:
 
 
-# # Convert the mp4 video to ogg format
-# makeOgg = 'ffmpeg -i ../video/US_Inflation_Unemployment_Monthly_BP_Filtered.mp4 -acodec libvorbis -ac 2 -ab 128k -ar 44100 -b:v 1800k  ../video/US_Inflation_Unemployment_Monthly_BP_Filtered.ogv'
-# subprocess.call(makeOgg,shell=True)
+# # Also write the ogg video from the same frames, without a transcode pass, with this writer
+# writer = renderer.multi_writer([renderer.rendition('../video/us_inflation_unemployment_monthly_bp_filtered.ogv',bitrate=1800)], fps=10, metadata=dict(artist='Brian C Jenkins'), bitrate=5000)
 
@@ -0,0 +1,123 @@
+# Per-frame cost of the Beveridge and Phillips curve animations over a full monthly history. The original update_plot
+# added one Line2D artist per frame, so frame i drew i artists and a render cost O(n^2) artist draws. The scripts now
+# update one PathCollection in place. Run from this directory:
+#
+#     python benchmark_scatter.py [--months N]
+#
+# The data are a synthetic random walk with the length of the monthly history since 1948, so no download is needed.
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+plt.style.use('classic')
+plt.rcParams['figure.facecolor'] = 'white'
+plt.rc('font', weight='bold', size=15)
+
+
+def make_figure():
+
+    ''' Returns a figure, axes and year text laid out like us_beveridge_curve_animation.py.'''
+
+    fig = plt.figure(figsize=(12, 12*9/16))
+    ax = fig.add_subplot(1,1,1)
+    ax.grid()
+    ax.set_ylim(0, 3.5)
+    ax.set_xlim(0, 16)
+    ax.set_xlabel('Unemployment rate (%)')
+    ax.set_ylabel('Vacancy rate (%)')
+    ax.set_title('US Beveridge Curve',fontsize=20)
+    text = ax.text(15.5, 3.125, '',fontsize=18,horizontalalignment='right')
+    ax.text(12.25,0.05, 'Created by Brian C. Jenkins',fontsize=11, color='black',alpha=0.5)
+    fig.tight_layout()
+    return fig,ax,text
+
+
+def artist_per_frame(x,y,colors,years):
+
+    ''' The original update_plot: a new Line2D for every frame.'''
+
+    fig,ax,text = make_figure()
+
+    def update_plot(i):
+        scatter = ax.plot(x[i],y[i],'o',fillstyle='none',alpha=0.9,markeredgecolor=colors[i], markeredgewidth=2,markersize=13)
+        text.set_text(years[i])
+        return scatter, text
+
+    return fig,update_plot
+
+
+def collection(x,y,colors,years):
+
+    ''' The current update_plot: one PathCollection updated from preallocated arrays.'''
+
+    fig,ax,text = make_figure()
+    offsets = np.column_stack([x,y])
+    edgecolors = np.array(colors)
+    sizes = np.full(len(x),13.0**2)
+    scatter = ax.scatter([],[],marker='o',facecolors='none',linewidths=2,alpha=0.9)
+
+    def update_plot(i):
+        scatter.set_offsets(offsets[:i+1])
+        scatter.set_edgecolors(edgecolors[:i+1])
+        scatter.set_sizes(sizes[:i+1])
+        text.set_text(years[i])
+        return scatter, text
+
+    return fig,update_plot
+
+
+def time_frames(fig,update_plot,n):
+
+    ''' Returns the seconds spent updating and drawing each of n frames and the RGBA pixels of the last frame.'''
+
+    times = np.zeros(n)
+    fig.canvas.draw()
+    for i in range(n):
+        start = time.perf_counter()
+        update_plot(i)
+        fig.canvas.draw()
+        times[i] = time.perf_counter()-start
+    pixels = np.array(fig.canvas.buffer_rgba())
+    plt.close(fig)
+    return times,pixels
+
+
+def bench_scatter(n):
+
+    ''' Times both versions of update_plot over n monthly frames.'''
+
+    rng = np.random.default_rng(0)
+    x = np.clip(6+np.cumsum(rng.normal(0,0.15,n)),1,15)
+    y = np.clip(2+np.cumsum(rng.normal(0,0.05,n)),0.2,3.3)
+    cmap = plt.get_cmap('rainbow', n)
+    colors = [cmap(i) for i in range(n)]
+    years = pd.date_range('1948-01-01',periods=n,freq='MS').year.astype(str)
+
+    old,old_pixels = time_frames(*artist_per_frame(x,y,colors,years),n)
+    new,new_pixels = time_frames(*collection(x,y,colors,years),n)
+    differ = int(np.any(old_pixels!=new_pixels,axis=2).sum())
+
+    print('update_plot over %d monthly frames (ms per frame)' % n)
+    print('%24s %12s %12s %12s %12s' % ('','first 10%','last 10%','mean','total (s)'))
+    tenth = max(n//10,1)
+    for label,times in [('artist per frame',old),('one PathCollection',new)]:
+        print('%24s %12.2f %12.2f %12.2f %12.2f' % (label,1000*times[:tenth].mean(),1000*times[-tenth:].mean(),1000*times.mean(),times.sum()))
+    print('speedup %.1fx; %d pixels of the last frame differ' % (old.sum()/new.sum(),differ))
+
+    return dict(frames=n,artist_per_frame=old.sum(),collection=new.sum(),last_frame_artist_per_frame=old[-tenth:].mean(),
+                last_frame_collection=new[-tenth:].mean(),pixels_differing=differ)
+
+
+if __name__ == '__main__':
+
+    months = len(pd.date_range('1948-01-01',pd.Timestamp.today(),freq='MS'))
+    parser = argparse.ArgumentParser(description='Benchmarks update_plot of the Beveridge and Phillips curve animations.')
+    parser.add_argument('--months',type=int,default=months,help='number of monthly frames (default: January 1948 to today)')
+    args = parser.parse_args()
+
+    bench_scatter(args.months)
@@ -0,0 +1,475 @@
+# On-disk cache for the data the animations download. Each FRED series or CSV table is kept in one .npz file with
+# its dates, values and metadata, including when it was fetched, so a rerun reads the file instead of the network:
+#
+#     import fred_cache
+#     u = fred_cache.series('LNS14000028')            # a fredpy series, like fp.series('LNS14000028')
+#     y10,y30 = fred_cache.fetch(['DGS10','DGS30'])   # several series, downloaded concurrently
+#     yields = fred_cache.fetch_frame(['DGS10','DGS30'],['10 yr','30 yr'])   # the same, as columns of a DataFrame
+#     data = fred_cache.table('beveridge_curve_data', url, index_col=0, parse_dates=True)
+#
+# Series are downloaded from the FRED API at api_url, or FRED_API_URL, e.g. a local stand-in serving canned
+# responses, with the key in FRED_API_KEY or fredpy's. Requests that fail with a timeout, a dropped connection or
+# status 429 or 5xx are retried after backoff, 2*backoff, 4*backoff, ... seconds, up to retries times.
+#
+# A cached copy younger than max_age seconds (default: one day) is used as it is. An older copy of a series is
+# refreshed: if FRED's last_updated is unchanged nothing else is downloaded, and otherwise only the observations from
+# the overlap-th last cached one on. When those overlapping observations match the cache the rest are appended, and
+# when FRED has revised any of them the whole series is downloaded again. A table is downloaded again. The old copy
+# is kept if a download fails. In offline mode nothing is downloaded and a missing entry is an error, so a render
+# uses only the data already on disk; set FRED_OFFLINE=1 or fred_cache.offline = True. The cache is the directory
+# ../.fred-cache next to the video and image directories, or the directory named by FRED_CACHE.
+#
+# The cache also keeps real-time histories from ALFRED, e.g. of CPIAUCSL, LNS14000028 and JTSJOL (JOLTS job
+# openings), to give a series as it was known on some date, like fp.series(series_id, observation_date=date):
+#
+#     p = fred_cache.series('CPIAUCSL', vintage='1990-06-30')
+#
+# A history is stored as one row per observation and period in which its value stood: the value and the first and
+# last days it was current. A revision adds one row, so a history costs about as much as the revisions it holds,
+# and any vintage is the rows whose period contains its date, picked out by one comparison over the columns. With
+# FRED_VINTAGE=1990-06-30 or fred_cache.vintage_date = '1990-06-30' every series comes from its history, so the
+# scripts run unchanged on the data of that date.
+#
+# The cache can be seeded from fixture files, e.g. on a machine without network access or a FRED API key:
+#
+#     python fred_cache.py seed fixtures             # copy fixtures/DGS10.csv, fixtures/DTB3.npz, ... into the cache
+#     python fred_cache.py fetch DGS10 DGS30         # download now, e.g. before going offline
+#     python fred_cache.py vintages CPIAUCSL JTSJOL  # download real-time histories
+#     python fred_cache.py list                      # entries, their date ranges and when they were fetched
+#
+# A fixture is an .npz file written by this module or a CSV file with dates in the first column and one column of
+# values per series, as FRED's download button writes them. Next to a CSV file, a .json file with the same name can
+# give metadata such as title, units and frequency_short.
+
+import os
+import json
+import time
+import shutil
+import argparse
+import warnings
+import datetime
+import urllib.error
+import urllib.parse
+import urllib.request
+import concurrent.futures
+import numpy as np
+import pandas as pd
+
+
+cache_dir = os.environ.get('FRED_CACHE',os.path.join('..','.fred-cache'))
+offline = os.environ.get('FRED_OFFLINE','').lower() in ('1','true','yes')
+vintage_date = os.environ.get('FRED_VINTAGE') or None
+day = 24*60*60
+api_url = os.environ.get('FRED_API_URL','https://api.stlouisfed.org/')
+retries = 4
+overlap = 60
+backoff = 1.0
+timeout = 30
+page = 100000
+
+# Responses of the FRED API that are worth repeating a request for
+retry_statuses = (429,500,502,503,504)
+
+# Attributes of a fredpy series that are stored with its data
+attributes = ['series_id','title','frequency','frequency_short','units','units_short','seasonal_adjustment',
+              'seasonal_adjustment_short','last_updated','observation_date','notes','release','source','t']
+
+# Frequency names and observations per year of FRED's short frequency codes, and the codes of pandas offsets
+frequencies = {'D':('Daily',365),'W':('Weekly',52),'M':('Monthly',12),'Q':('Quarterly',4),'SA':('Semiannual',2),'A':('Annual',1)}
+offsets = {'B':'D','C':'D','D':'D','W':'W','M':'M','Q':'Q','A':'A','Y':'A'}
+
+
+def entry_path(name,directory=None):
+
+    ''' Returns the path of the cache file of name.'''
+
+    return os.path.join(directory or cache_dir,name+'.npz')
+
+
+def now():
+
+    ''' Returns the current UTC time as an ISO 8601 string.'''
+
+    return datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')
+
+
+def age(meta):
+
+    ''' Returns the seconds since the entry with metadata meta was fetched.'''
+
+    fetched = datetime.datetime.fromisoformat(meta['fetched'])
+    return (datetime.datetime.now(datetime.timezone.utc)-fetched).total_seconds()
+
+
+def store(name,data,meta,directory=None):
+
+    ''' Writes a Series or DataFrame with a DatetimeIndex to the cache with the dict meta, replacing any earlier
+        entry of name. The file is written whole or not at all. Adds the fetch time to meta unless it has one.'''
+
+    directory = directory or cache_dir
+    os.makedirs(directory,exist_ok=True)
+    frame = data.to_frame(name='' if data.name is None else data.name) if isinstance(data,pd.Series) else data
+    meta = dict(meta,series=isinstance(data,pd.Series),index_name=frame.index.name,freq=frame.index.freqstr)
+    meta.setdefault('fetched',now())
+
+    path = entry_path(name,directory)
+    part = path+'.part'
+    with open(part,'wb') as f:
+        np.savez(f,index=frame.index.values.astype('datetime64[ns]'),values=frame.to_numpy(dtype=float),
+                 columns=np.array([str(c) for c in frame.columns]),meta=np.array(json.dumps(meta)))
+    os.replace(part,path)
+
+
+def load(name,directory=None):
+
+    ''' Returns the (data,meta) of the cache entry of name, where data is a Series or DataFrame as it was stored, or
+        None when there is no entry.'''
+
+    path = entry_path(name,directory)
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as f:
+        meta = json.loads(str(f['meta']))
+        index = pd.DatetimeIndex(f['index'],name=meta['index_name'],freq=meta['freq'])
+        data = pd.DataFrame(f['values'],index=index,columns=list(f['columns']))
+    if meta['series']:
+        data = data.iloc[:,0].rename(data.columns[0] or None)
+    return data,meta
+
+
+def cached(name,download,max_age=day,directory=None):
+
+    ''' Returns the (data,meta) of name from the cache, calling download(entry) with the cached (data,meta) or None
+        for a new (data,meta) and storing it when the entry is missing or older than max_age seconds. A failed
+        download falls back to an older entry.'''
+
+    entry = load(name,directory)
+    if entry is not None and (offline or max_age is None or age(entry[1])<=max_age):
+        return entry
+    if offline:
+        raise LookupError('%s is not in the cache at %s and offline mode is on' % (name,directory or cache_dir))
+
+    try:
+        data,meta = download(entry)
+    except Exception as error:
+        if entry is None:
+            raise
+        warnings.warn('could not download %s (%s); using the copy fetched %s' % (name,error,entry[1]['fetched']))
+        return entry
+
+    # Read back what was written, so a fresh download and a cached copy give the same objects
+    store(name,data,meta,directory)
+    return load(name,directory)
+
+
+def frequency_short(index):
+
+    ''' Returns FRED's short frequency code for the dates in index, or '' if it has no regular frequency.'''
+
+    code = index.freqstr or (pd.infer_freq(index) if len(index)>2 else None)
+    if code is None:
+        return ''
+    return 'SA' if code.startswith('6M') else offsets.get(code.lstrip('0123456789')[:1],'')
+
+
+def to_series(data,meta):
+
+    ''' Returns a fredpy series with data and the attributes in meta, without querying FRED.'''
+
+    import fredpy as fp
+
+    # fredpy's methods copy series through series(), which refuses to run without an API key. The key is only used
+    # for downloads, so a series from the cache works with an empty one
+    if fp.api_key is None:
+        fp.api_key = ''
+    s = fp.series()
+    s.data = data
+    for attribute in attributes:
+        if attribute in meta:
+            setattr(s,attribute,meta[attribute])
+    if not s.frequency and s.frequency_short in frequencies:
+        s.frequency = frequencies[s.frequency_short][0]
+    if not s.t and s.frequency_short in frequencies:
+        s.t = frequencies[s.frequency_short][1]
+    if len(data):
+        s.date_range = 'Range: '+str(data.index[0])[:10]+' to '+str(data.index[-1])[:10]
+    return s
+
+
+def api_key():
+
+    ''' Returns the FRED API key from FRED_API_KEY or from fredpy, which reads fred_api_key.txt.'''
+
+    key = os.environ.get('FRED_API_KEY')
+    if key is None:
+        import fredpy as fp
+        key = fp.api_key
+    if not key:
+        raise ValueError('no FRED API key; set FRED_API_KEY or fredpy.api_key')
+    return key.strip()
+
+
+def request(path,parameters):
+
+    ''' Returns the JSON response of the FRED API to path with parameters as a dict. Retries timeouts, dropped
+        connections and the statuses in retry_statuses up to retries times with exponential backoff.'''
+
+    query = urllib.parse.urlencode(dict(parameters,api_key=api_key(),file_type='json'))
+    url = api_url.rstrip('/')+'/'+path+'?'+query
+    for attempt in range(retries+1):
+        try:
+            with urllib.request.urlopen(url,timeout=timeout) as response:
+                return json.load(response)
+        except urllib.error.HTTPError as error:
+            if error.code not in retry_statuses or attempt==retries:
+                raise
+        except (urllib.error.URLError,TimeoutError,ConnectionError):
+            if attempt==retries:
+                raise
+        time.sleep(backoff*2**attempt)
+
+
+def download_series(series_id):
+
+    ''' Downloads series_id from the FRED API and returns its (data,meta), with the data and attributes fredpy
+        gives it.'''
+
+    info = request('fred/series',dict(series_id=series_id))['seriess'][0]
+    observations = request('fred/series/observations',dict(series_id=series_id))['observations']
+    release = request('fred/series/release',dict(series_id=series_id))['releases'][0]
+    source = request('fred/release/sources',dict(release_id=release['id']))['sources'][0]
+
+    meta = series_meta(info)
+    meta.update(series_id=series_id,release=release['name'],source=source['name'])
+    return with_frequency(parse_observations(observations)),meta
+
+
+def parse_observations(observations):
+
+    ''' Returns the observations of a FRED API response as a Series. Missing values are '.'.'''
+
+    values = [float('nan') if o['value']=='.' else float(o['value']) for o in observations]
+    return pd.Series(values,pd.DatetimeIndex([o['date'] for o in observations],name='date'),name='value')
+
+
+def with_frequency(data):
+
+    ''' Returns data with the frequency of its index set when pandas can infer it, as fredpy does. An inferred
+        frequency has no gaps to fill, so the index is only relabeled; asfreq would build the date range again.'''
+
+    freq = pd.infer_freq(data.index) if len(data)>2 else None
+    return data if freq is None else data.set_axis(pd.DatetimeIndex(data.index,freq=freq))
+
+
+def series_meta(info):
+
+    ''' Returns the attributes of a series from the FRED API's description info of it.'''
+
+    meta = {attribute:info[attribute] for attribute in attributes if attribute in info}
+    meta.update(observation_date=datetime.date.today().strftime('%B %d, %Y'),t=frequencies.get(info['frequency_short'],('',None))[1])
+    return meta
+
+
+def update_series(series_id,entry):
+
+    ''' Returns the (data,meta) of series_id given its cache entry (data,meta), or None, downloading as little as
+        possible. The cached observations from the overlap-th last one on are downloaded again to check for
+        revisions; if any of them changed, the whole series is downloaded again.'''
+
+    if entry is None or not entry[1]['series'] or len(entry[0])==0:
+        return download_series(series_id)
+    data,meta = entry
+    data = data.rename('value').rename_axis('date')
+
+    info = request('fred/series',dict(series_id=series_id))['seriess'][0]
+    meta = dict(meta,fetched=now(),**series_meta(info))
+    if info['last_updated']==entry[1].get('last_updated'):
+        return data,meta
+
+    kept = max(len(data)-overlap,0)
+    parameters = dict(series_id=series_id,observation_start=data.index[kept].strftime('%Y-%m-%d'))
+    recent = parse_observations(request('fred/series/observations',parameters)['observations'])
+    if not recent.iloc[:len(data)-kept].equals(data.iloc[kept:]):
+        return download_series(series_id)
+    return with_frequency(pd.concat([data.iloc[:kept],recent])),meta
+
+
+def days(dates):
+
+    ''' Returns dates as days since 1970-01-01, the real-time columns of a history. Parsed by numpy at day resolution,
+        since FRED's open end '9999-12-31' is out of the range of nanosecond timestamps.'''
+
+    return (np.array(dates,dtype='datetime64[D]')-np.datetime64('1970-01-01','D')).astype(float)
+
+
+def compact(history):
+
+    ''' Returns a history sorted by observation date and start, with consecutive periods of an observation that have
+        the same value merged into one row, so that each row after the first of an observation is a revision.'''
+
+    history = history.sort_values(['date','realtime_start'],kind='stable')
+    date = history.index.values
+    value,start,end = (history[c].to_numpy() for c in ('value','realtime_start','realtime_end'))
+    same = (date[1:]==date[:-1]) & ((value[1:]==value[:-1]) | (np.isnan(value[1:]) & np.isnan(value[:-1]))) & (start[1:]==end[:-1]+1)
+    first = np.flatnonzero(~np.r_[False,same])
+    last = np.r_[first[1:]-1,len(history)-1]
+    history = history.iloc[first].copy()
+    history['realtime_end'] = end[last]
+    return history
+
+
+def download_history(series_id,entry=None):
+
+    ''' Downloads the real-time history of series_id from ALFRED and returns its (history,meta). history has one row
+        per observation date and period with the value and the first and last days of the period, as days since
+        1970. If the cache entry (history,meta) is given and FRED's last_updated is unchanged, it is reused.'''
+
+    info = request('fred/series',dict(series_id=series_id))['seriess'][0]
+    if entry is not None and info['last_updated']==entry[1].get('last_updated'):
+        return entry[0],dict(entry[1],fetched=now())
+
+    rows = []
+    while True:
+        parameters = dict(series_id=series_id,realtime_start='1776-07-04',realtime_end='9999-12-31',output_type=1,limit=page,offset=len(rows))
+        response = request('fred/series/observations',parameters)
+        rows += response['observations']
+        if not response['observations'] or len(rows)>=response['count']:
+            break
+    release = request('fred/series/release',dict(series_id=series_id))['releases'][0]
+    source = request('fred/release/sources',dict(release_id=release['id']))['sources'][0]
+
+    history = pd.DataFrame({'value':parse_observations(rows).values,'realtime_start':days([o['realtime_start'] for o in rows]),
+                            'realtime_end':days([o['realtime_end'] for o in rows])},index=pd.DatetimeIndex([o['date'] for o in rows],name='date'))
+    meta = series_meta(info)
+    meta.update(series_id=series_id,release=release['name'],source=source['name'])
+    return compact(history),meta
+
+
+def reconstruct(history,date):
+
+    ''' Returns the observations of a real-time history as they were known on date, as a Series like fredpy's.'''
+
+    day = days([pd.Timestamp(date)])[0]
+    rows = (history['realtime_start'].to_numpy()<=day) & (day<=history['realtime_end'].to_numpy())
+    return with_frequency(pd.Series(history['value'].to_numpy()[rows],history.index[rows],name='value'))
+
+
+def series(series_id,max_age=day,directory=None,vintage=None):
+
+    ''' Returns the fredpy series of series_id, as fp.series(series_id) does, from the cache when it has a copy
+        younger than max_age seconds. max_age=None uses any cached copy. With a vintage date, or vintage_date, the
+        series is the one known on that date, taken from the cached real-time history of series_id.'''
+
+    vintage = vintage or vintage_date
+    if vintage is None:
+        data,meta = cached(series_id,lambda entry: update_series(series_id,entry),max_age,directory)
+        return to_series(data,meta)
+
+    history,meta = cached(series_id+'.vintages',lambda entry: download_history(series_id,entry),max_age,directory)
+    return to_series(reconstruct(history,vintage),dict(meta,observation_date=pd.Timestamp(vintage).strftime('%B %d, %Y')))
+
+
+def fetch(series_ids,workers=4,max_age=day,directory=None,vintage=None):
+
+    ''' Returns the fredpy series of series_ids in order, as fred_cache.series does. Series that are not cached are
+        downloaded concurrently by at most workers threads.'''
+
+    workers = max(min(workers,len(series_ids)),1)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda series_id: series(series_id,max_age,directory,vintage),series_ids))
+
+
+def fetch_frame(series_ids,names=None,workers=4,max_age=day,directory=None,vintage=None):
+
+    ''' Returns the series of series_ids, fetched as by fetch, as the columns of one DataFrame aligned on their dates,
+        with the days on which none of them has an observation dropped. The columns are named names, or the series
+        ids.'''
+
+    downloaded = fetch(series_ids,workers,max_age,directory,vintage)
+    names = series_ids if names is None else names
+    return pd.concat([s.data.rename(name) for s,name in zip(downloaded,names)],axis=1).dropna(thresh=1)
+
+
+def table(name,url,max_age=day,directory=None,**kwargs):
+
+    ''' Returns the DataFrame of pd.read_csv(url,**kwargs), stored in the cache as name, from the cache when it has a
+        copy younger than max_age seconds. The DataFrame must have dates as its index and numbers as its values.'''
+
+    data,meta = cached(name,lambda entry: (pd.read_csv(url,**kwargs),dict(url=url)),max_age,directory)
+    return data
+
+
+def read_fixture(path):
+
+    ''' Returns the (data,meta) of a CSV fixture: a Series if the file has one column of values, else a DataFrame.'''
+
+    data = pd.read_csv(path,index_col=0,parse_dates=True,na_values='.')
+    meta = {}
+    if os.path.exists(os.path.splitext(path)[0]+'.json'):
+        with open(os.path.splitext(path)[0]+'.json') as f:
+            meta = json.load(f)
+
+    # FRED's files name the value column after the series
+    if data.shape[1]==1:
+        data = data.iloc[:,0]
+        meta.setdefault('series_id',data.name)
+        meta.setdefault('frequency_short',frequency_short(data.index))
+    meta.setdefault('fetched',datetime.datetime.fromtimestamp(os.path.getmtime(path),datetime.timezone.utc).isoformat(timespec='seconds'))
+    meta['fixture'] = os.path.abspath(path)
+    return data,meta
+
+
+def seed(fixtures,directory=None,overwrite=False):
+
+    ''' Copies the .npz and .csv fixture files in the directory fixtures into the cache and returns the names of the
+        entries written. Entries already in the cache are kept unless overwrite is True. A fixture counts as fetched
+        when its file was last modified, so outside offline mode an old fixture is replaced by a download.'''
+
+    directory = directory or cache_dir
+    os.makedirs(directory,exist_ok=True)
+    written = []
+    for filename in sorted(os.listdir(fixtures)):
+        name,ext = os.path.splitext(filename)
+        path = os.path.join(fixtures,filename)
+        if ext not in ('.npz','.csv') or (os.path.exists(entry_path(name,directory)) and not overwrite):
+            continue
+        if ext=='.npz':
+            load(name,fixtures)
+            shutil.copyfile(path,entry_path(name,directory))
+        else:
+            store(name,*read_fixture(path),directory=directory)
+        written.append(name)
+    return written
+
+
+def entries(directory=None):
+
+    ''' Returns the names of the entries in the cache.'''
+
+    directory = directory or cache_dir
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.splitext(f)[0] for f in os.listdir(directory) if f.endswith('.npz'))
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Seeds, fills and lists the on-disk cache of FRED series.')
+    parser.add_argument('command',choices=['seed','fetch','vintages','list'])
+    parser.add_argument('names',nargs='*',help='fixture directory for seed, series ids for fetch and vintages')
+    parser.add_argument('--cache',default=None,help='cache directory (default: %s)' % cache_dir)
+    parser.add_argument('--overwrite',action='store_true',help='replace entries already in the cache when seeding')
+    parser.add_argument('--workers',type=int,default=4,help='concurrent downloads for fetch')
+    args = parser.parse_args()
+
+    if args.command=='seed':
+        for fixtures in args.names:
+            print('seeded: '+' '.join(seed(fixtures,args.cache,args.overwrite)))
+    elif args.command=='fetch':
+        fetch(args.names,args.workers,max_age=0,directory=args.cache)
+    elif args.command=='vintages':
+        for series_id in args.names:
+            cached(series_id+'.vintages',lambda entry: download_history(series_id,entry),0,args.cache)
+    for name in entries(args.cache) if args.command!='seed' else []:
+        data,meta = load(name,args.cache)
+        print('%-24s %6d rows  %s to %s  fetched %s' % (name,len(data),str(data.index[0])[:10],str(data.index[-1])[:10],meta['fetched']))
@@ -12,6 +12,9 @@ import matplotlib.cm as cm
 import numpy as np
 import pandas as pd
 import subprocess
+import warnings
+import renderer
+import fred_cache
 import os
 
 plt.style.use('classic')
@@ -26,9 +29,23 @@ main_width = 16
 main_height = 9
 ratio = main_height/main_width
 
-data = pd.read_csv('https://raw.githubusercontent.com/letsgoexploring/economic-data/refs/heads/main/dmp/csv/beveridge_curve_data.csv',index_col=0,parse_dates=True)
+# Download data, or read it from the cache in ../.fred-cache when it was downloaded less than a day ago
+data = fred_cache.table('beveridge_curve_data','https://raw.githubusercontent.com/letsgoexploring/economic-data/refs/heads/main/dmp/csv/beveridge_curve_data.csv',index_col=0,parse_dates=True)
 
 data = data.loc['1947':]
+
+# With a vintage date set (FRED_VINTAGE), the sample ends on that date. The table has no vintages, so only the
+# vacancies from December 2000 on are replaced, by the JOLTS job openings known on that date, and the sample then ends
+# with the last month JOLTS had published. Before JOLTS was first published in 2002 there are none to replace them
+if fred_cache.vintage_date is not None:
+    warnings.warn('the Beveridge curve table has no vintages: unemployment and the labor force are the current data, cut at %s' % fred_cache.vintage_date)
+    data = data.loc[:pd.Timestamp(fred_cache.vintage_date)].copy()
+    openings = fred_cache.series('JTSJOL').data
+    if len(openings):
+        data = data.loc[:openings.index[-1]].copy()
+        months = data.index.intersection(openings.index)
+        data.loc[months,'Vacancies [Thousands of vacancies]'] = openings[months]
+
 u_rate = data['Unemployment [Thousands of persons]']/data['Labor force [Thousands of persons]']*100
 theta = data['Vacancies [Thousands of vacancies]']/data['Labor force [Thousands of persons]']*100
 
@@ -70,44 +87,60 @@ ax.text(12.25,0.05, 'Created by Brian C. Jenkins',fontsize=11, color='black',alp
 
 fig.tight_layout()
 
+# All points in one PathCollection. Offsets, edge colors and sizes are preallocated and update_plot shows the first
+# i+1 points by passing slices of them, so each frame draws one artist instead of one artist per period
+offsets = np.column_stack([u_rate.values,theta.values])
+edgecolors = np.array(colors)
+sizes = np.full(n,13.0**2)
+scatter = ax.scatter([],[],marker='o',facecolors='none',linewidths=2,alpha=0.9)
+
 # Function for updating the plot with new data points
 def update_plot(i):
 
-    scatter = ax.plot(u_rate.iloc[i],theta.iloc[i],'o',fillstyle='none',alpha=0.9,markeredgecolor=colors[i], markeredgewidth=2,markersize=13)
+    scatter.set_offsets(offsets[:i+1])
+    scatter.set_edgecolors(edgecolors[:i+1])
+    scatter.set_sizes(sizes[:i+1])
     text.set_text(years[i])
 
     return scatter, text
 
+# One frame per period
+frames = range(n)
+
+# Frame i shows points 0 through i in their colors, so each key chains the point and color of period i to the key
+# of the period before. The colormap spans the whole sample, so a new period changes every key and the movie is
+# rendered in full; with unchanged data a rerun renders nothing
+keys = renderer.chain_keys(offsets, edgecolors, years)
+
 
 # In[4]:
 
 
-# Make directories for output if they don't exist
-if not os.path.isdir('../video'):
-    os.mkdir('../video')
+if __name__ == '__main__':
+
+    # Make directories for output if they don't exist
+    if not os.path.isdir('../video'):
+        os.mkdir('../video')
 
-if not os.path.isdir('../image'):
-    os.mkdir('../image')
+    if not os.path.isdir('../image'):
+        os.mkdir('../image')
 
 
-# In[5]:
+    # In[5]:
 
 
-# Set up formatting for the movie files
-Writer = animation.writers['ffmpeg']
-writer = Writer(fps=10, metadata=dict(artist='Brian C Jenkins'), bitrate=5000)
+    # Set up formatting for the movie files
+    Writer = animation.writers['ffmpeg']
+    writer = Writer(fps=10, metadata=dict(artist='Brian C Jenkins'), bitrate=5000)
 
-# Make the animation
-ani = animation.FuncAnimation(fig, update_plot, frames = n,fargs = (), blit=False,repeat=False,interval=20)
+    # Render the frames in parallel and save the animation as .mp4
+    renderer.render_appending(fig, update_plot, frames, keys, '../video/us_beveridge_curve.mp4', writer, cache=True)
 
-# Save the animation as .mp4
-# ani.save('../video/US_Inflation_Unemployment_Monthly_BP_Filtered.ogv',fps=10,codec='libtheora')
-ani.save('../video/us_beveridge_curve.mp4',writer=writer)
+    # Save the final image of the animation to use as the still image placeholder
+    update_plot(n-1)
+    plt.savefig('../image/us_beveridge_curve.png',bbox_inches='tight',dpi=120)
 
-# Save the final image of the animation to use as the still image placeholder
-plt.savefig('../image/us_beveridge_curve.png',bbox_inches='tight',dpi=120)
 
-# # Convert the mp4 video to ogg format
-# makeOgg = 'ffmpeg -i ../video/US_Inflation_Unemployment_Monthly_BP_Filtered.mp4 -acodec libvorbis -ac 2 -ab 128k -ar 44100 -b:v 1800k  ../video/US_Inflation_Unemployment_Monthly_BP_Filtered.ogv'
-# subprocess.call(makeOgg,shell=True)
+# # Also write the ogg video from the same frames, without a transcode pass, with this writer
+# writer = renderer.multi_writer([renderer.rendition('../video/us_beveridge_curve.ogv',bitrate=1800)], fps=10, metadata=dict(artist='Brian C Jenkins'), bitrate=5000)
 
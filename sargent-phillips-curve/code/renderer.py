@@ -0,0 +1,1054 @@
+# Parallel rendering of matplotlib animations with ffmpeg.
+#
+# An animation is a figure and a function func(i) that draws frame i on the figure. When func is a pure function
+# of the frame index, frames can be drawn in any order and by any process. render() splits the frames into chunks,
+# draws each chunk in a worker process with its own copy of the figure and writes the chunk losslessly. The chunks
+# are then joined with the ffmpeg concat demuxer and encoded once with the settings of the movie writer, so the
+# result is the same as FuncAnimation(fig,func,frames).save(filename,writer=writer).
+#
+# With blit=True the static layer of the figure (everything func does not return) is rasterized once and each frame
+# only redraws the artists func returns on top of it, as FuncAnimation does on screen with blit=True. With raw=True
+# (implied by blit) frames are drawn on the canvas and its RGBA buffer is written straight to ffmpeg as rawvideo by a
+# writer thread instead of going through savefig, so drawing and encoding overlap.
+#
+# A multi_writer encodes the frame stream to several files at once, e.g. smaller mp4s, webm, ogv and a gif preview,
+# with an ffmpeg split filter, so each frame is drawn once and nothing is transcoded afterwards.
+#
+# With checkpoint=True the chunks are fixed-size segments kept in a directory next to the movie with a manifest of the
+# render. Each segment file appears only when it is complete, so a render that is killed can be run again and draws
+# only the segments that are missing. The manifest holds a hash of the script and the matplotlib version and rcParams,
+# so segments are drawn again after the script or matplotlib changes.
+#
+# With cache=True finished movies and segments are stored in a content-addressed cache. A movie is reused when the
+# code and module-level data of the script, the writer settings and the frames are unchanged. Otherwise each segment
+# is looked up by a fingerprint of the draw calls of its frames, so an edit redraws only the segments it changes.
+#
+# With keys, one per frame, a movie whose frames are a prefix of the new ones is extended: only the new frames are
+# drawn and encoded, and the encoded movie is joined to them without re-encoding.
+#
+# A scene wraps an animation script for random access: scene('increase_tfp').render_frame(30) returns the pixels of
+# frame 30 without drawing frames 0 through 29. From the command line:
+#
+#     python renderer.py increase_tfp 30 --output frame.png
+#     python renderer.py increase_tfp --order-check     # same pixels drawn forward, in reverse and cold?
+
+import os
+import io
+import sys
+import time
+import json
+import hashlib
+import argparse
+import importlib
+import shutil
+import tempfile
+import subprocess
+import pathlib
+import threading
+import queue
+import multiprocessing
+import numpy as np
+import matplotlib
+import matplotlib.animation as animation
+import matplotlib.image
+import matplotlib.mathtext
+import matplotlib.artist
+import matplotlib.colors as mcolors
+import matplotlib.path as mpath
+import matplotlib.transforms as mtransforms
+from matplotlib.backend_bases import RendererBase
+from matplotlib.backends.backend_agg import RendererAgg
+from matplotlib.font_manager import FontProperties
+
+# Figure, callback and save settings of the animation being rendered. Set before the worker processes are forked
+_scene = None
+
+# Scene whose frames order_check draws in forked processes
+_checked = None
+
+
+def save_settings(fig,dpi=None,transparent=False):
+
+    ''' Returns the dpi and the savefig keyword arguments that FuncAnimation.save would use for a movie format that
+        does (transparent=True) or does not support transparency.'''
+
+    if dpi is None:
+        dpi = matplotlib.rcParams['savefig.dpi']
+    if dpi == 'figure':
+        dpi = fig.dpi
+
+    # Formats without transparency get the facecolor composited onto white, as in FuncAnimation.save
+    savefig_kwargs = {}
+    if not transparent:
+        facecolor = matplotlib.rcParams['savefig.facecolor']
+        if facecolor == 'auto':
+            facecolor = fig.get_facecolor()
+        r,g,b,a = mcolors.to_rgba(facecolor)
+        savefig_kwargs['facecolor'] = a*np.array([r,g,b])+1-a
+        savefig_kwargs['transparent'] = False
+
+    return dpi,savefig_kwargs
+
+
+def artist_list(artists):
+
+    ''' Returns the artists in the (possibly nested) iterable returned by a frame function as a flat list.'''
+
+    if artists is None:
+        return []
+    if isinstance(artists,matplotlib.artist.Artist):
+        return [artists]
+    return [a for group in artists for a in artist_list(group)]
+
+
+class blitter:
+
+    ''' Draws frames of fig on a cached static layer.
+
+        The artists that func returns for the first frame are marked animated and the rest of the figure is drawn
+        once and kept as the background. Each frame restores the background and draws only the artists func returns,
+        in order of zorder. Artists that change between frames must be returned by func, including axes whose ticks
+        change. Dynamic artists are drawn on top of the static layer, so pixels differ from a full draw where a static
+        artist with a higher zorder (e.g. a grid) overlaps them.
+
+        Attributes:
+            fig:        the figure
+            func:       function that draws frame i and returns the artists it changed
+            background: the cached static layer'''
+
+    def __init__(self,fig,func,first,dpi,facecolor=None):
+
+        self.fig = fig
+        self.func = func
+
+        # The canvas draws at the dpi and facecolor that savefig would use for the frames
+        fig.set_dpi(dpi)
+        if facecolor is not None:
+            fig.patch.set_facecolor(facecolor)
+
+        for artist in artist_list(func(first)):
+            artist.set_animated(True)
+        fig.canvas.draw()
+        self.background = fig.canvas.copy_from_bbox(fig.bbox)
+
+    def __call__(self,i):
+
+        ''' Draws frame i and returns the RGBA pixels of the canvas as a memoryview.'''
+
+        artists = artist_list(self.func(i))
+        if not artists:
+            raise ValueError('blitting needs the frame function to return the artists it changes')
+
+        canvas = self.fig.canvas
+        canvas.restore_region(self.background)
+        for artist in sorted(artists,key=lambda a: a.get_zorder()):
+            artist.set_animated(True)
+            self.fig.draw_artist(artist)
+        return canvas.buffer_rgba()
+
+
+class redrawer:
+
+    ''' Draws frames of fig in full on its canvas, without going through savefig.
+
+        Attributes:
+            fig:    the figure
+            func:   function that draws frame i'''
+
+    def __init__(self,fig,func,dpi,facecolor=None):
+
+        self.fig = fig
+        self.func = func
+
+        # The canvas draws at the dpi and facecolor that savefig would use for the frames
+        fig.set_dpi(dpi)
+        if facecolor is not None:
+            fig.patch.set_facecolor(facecolor)
+
+    def __call__(self,i):
+
+        ''' Draws frame i and returns the RGBA pixels of the canvas as a memoryview.'''
+
+        self.func(i)
+        self.fig.canvas.draw()
+        return self.fig.canvas.buffer_rgba()
+
+
+class raw_writer:
+
+    ''' Writes raw RGBA frames to a stream, e.g. the stdin of ffmpeg, from a writer thread.
+
+        With depth=0 each frame, the canvas memoryview itself, is written before write() returns, with no copy. With
+        depth>0 write() copies the frame into one of depth preallocated buffers and returns, and the writer thread
+        sends the buffers to the stream in order, so the next frame is drawn while ffmpeg encodes. The one copy is
+        needed because Agg draws every frame into the same buffer. When all buffers are queued, write() waits.
+
+        Attributes:
+            stream: file object the frames are written to
+            depth:  number of frames that can wait to be written
+            error:  exception raised by the writer thread, if any'''
+
+    def __init__(self,stream,depth=4):
+
+        self.stream = stream
+        self.depth = depth
+        self.error = None
+        self.buffers = 0
+        if depth>0:
+            self.free = queue.Queue()
+            self.full = queue.Queue()
+            self.thread = threading.Thread(target=self.run,daemon=True)
+            self.thread.start()
+
+    def run(self):
+
+        ''' Writer thread: writes queued buffers until it gets None. After an error the rest are dropped.'''
+
+        while True:
+            buffer = self.full.get()
+            if buffer is None:
+                return
+            if self.error is None:
+                try:
+                    self.stream.write(buffer)
+                except Exception as e:
+                    self.error = e
+            self.free.put(buffer)
+
+    def write(self,frame):
+
+        ''' Writes frame, a buffer of RGBA pixels.'''
+
+        if self.error is not None:
+            raise self.error
+        if self.depth==0:
+            self.stream.write(frame)
+            return
+
+        try:
+            buffer = self.free.get_nowait()
+        except queue.Empty:
+            if self.buffers<self.depth:
+                buffer = np.empty(np.shape(frame),np.uint8)
+                self.buffers += 1
+            else:
+                buffer = self.free.get()
+        np.copyto(buffer,frame)
+        self.full.put(buffer)
+
+    def close(self):
+
+        ''' Waits for the queued frames to be written.'''
+
+        if self.depth>0 and self.thread.is_alive():
+            self.full.put(None)
+            self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self,*exc):
+
+        # Stop the thread without hiding an exception raised while drawing
+        try:
+            self.close()
+        except Exception:
+            if exc[0] is None:
+                raise
+
+
+class rendition:
+
+    ''' An extra output file of a multi_writer: the frames, optionally scaled and resampled, encoded with the codec for
+        the file's extension.
+
+        Attributes:
+            filename:   output file. The extension chooses the codec: .mp4 (h264), .webm (vp9), .ogv (theora) or .gif
+            height:     frame height in pixels. The width keeps the aspect ratio. Default: the size of the frames
+            fps:        frames per second. Default: the writer's
+            bitrate:    bitrate in kbps. Default: the writer's. Not used for .gif
+            args:       extra ffmpeg output arguments'''
+
+    codecs = {'.mp4':['-vcodec','h264','-pix_fmt','yuv420p'],
+              '.webm':['-vcodec','libvpx-vp9','-pix_fmt','yuv420p'],
+              '.ogv':['-vcodec','libtheora','-pix_fmt','yuv420p'],
+              '.gif':[]}
+
+    def __init__(self,filename,height=None,fps=None,bitrate=None,args=()):
+
+        self.filename = filename
+        self.height = height
+        self.fps = fps
+        self.bitrate = bitrate
+        self.args = list(args)
+        self.suffix = pathlib.Path(filename).suffix
+        if self.suffix not in self.codecs:
+            raise ValueError('no codec for %s files' % self.suffix)
+
+    def filters(self,k=0):
+
+        ''' Returns the ffmpeg filters applied to the frames before encoding, as a list of strings. k makes the labels
+            of the filter graph unique among the renditions of a writer.'''
+
+        filters = []
+        if self.fps is not None:
+            filters.append('fps=%s' % self.fps)
+        if self.height is not None:
+            filters.append('scale=-2:%d:flags=lanczos' % self.height)
+        if self.suffix=='.gif':
+            # A palette per frame, so the preview streams instead of waiting for the whole movie
+            filters.append('split[a{0}][b{0}];[a{0}]palettegen=stats_mode=single[p{0}];[b{0}][p{0}]paletteuse=new=1'.format(k))
+        return filters
+
+    def output_args(self,writer):
+
+        ''' Returns the ffmpeg arguments for encoding this file, given the multi_writer.'''
+
+        args = list(self.codecs[self.suffix])
+        bitrate = self.bitrate if self.bitrate is not None else writer.bitrate
+        if bitrate>0 and self.suffix!='.gif':
+            args.extend(['-b:v','%dk' % bitrate])
+        for k,v in writer.metadata.items():
+            args.extend(['-metadata','%s=%s' % (k,v)])
+        return args+self.args+[self.filename]
+
+
+def web_renditions(filename):
+
+    ''' Returns renditions of the movie filename for the web: 1080p, 720p and 480p mp4, webm, ogv and a gif preview,
+        named after filename, e.g. movie_720p.mp4 and movie_preview.gif for movie.mp4.'''
+
+    base = os.path.splitext(filename)[0]
+    return [rendition(base+'_1080p.mp4',height=1080),
+            rendition(base+'_720p.mp4',height=720),
+            rendition(base+'_480p.mp4',height=480),
+            rendition(base+'.webm'),
+            rendition(base+'.ogv'),
+            rendition(base+'_preview.gif',height=270,fps=10)]
+
+
+class multi_writer(animation.FFMpegWriter):
+
+    ''' An FFMpegWriter that also encodes the frames to the files of a list of renditions in the same ffmpeg run.
+
+        The output file of the render is encoded exactly as with an FFMpegWriter with the same settings. The frame
+        stream is split with the ffmpeg split filter and each rendition is scaled, resampled and encoded from its copy.
+        Use it in place of animation.writers['ffmpeg'], e.g.
+
+            writer = renderer.multi_writer(renderer.web_renditions('../video/movie.mp4'),fps=25,bitrate=3000)
+
+        Attributes:
+            renditions: list of rendition objects'''
+
+    def __init__(self,renditions,**kwargs):
+
+        super().__init__(**kwargs)
+        self.renditions = list(renditions)
+
+    def _args(self):
+
+        args = super()._args()
+        if not self.renditions:
+            return args
+
+        # Input arguments and the output arguments of the main file without the trailing '-y outfile'
+        start = args.index('pipe:')+1
+        head,main = args[:start],args[start:-2]
+        if '-filter_complex' in main:
+            raise ValueError('the main output of a multi_writer cannot use its own filter graph; add a rendition for %s instead' % self.outfile)
+
+        graph = ['[0:v]split=%d[main]%s' % (len(self.renditions)+1,''.join('[in%d]' % k for k in range(len(self.renditions))))]
+        outputs = []
+        for k,r in enumerate(self.renditions):
+            label = '[in%d]' % k
+            filters = r.filters(k)
+            if filters:
+                graph.append(label+','.join(filters)+'[out%d]' % k)
+                label = '[out%d]' % k
+            outputs += ['-map',label]+r.output_args(self)
+
+        return head+['-filter_complex',';'.join(graph),'-map','[main]']+main+['-y',self.outfile]+outputs
+
+
+def draw_frames(fig,func,frames,writer,filename,dpi,savefig_kwargs,blit=False,raw=False,depth=4):
+
+    ''' Draws frames with func and writes them to filename with writer. With blit=True only the artists func returns
+        are redrawn for each frame. With blit or raw the canvas pixels are written to ffmpeg by a raw_writer with
+        depth queued frames.'''
+
+    with writer.saving(fig,filename,dpi):
+        if blit or raw:
+            if blit:
+                draw = blitter(fig,func,frames[0],dpi,savefig_kwargs.get('facecolor'))
+            else:
+                draw = redrawer(fig,func,dpi,savefig_kwargs.get('facecolor'))
+            with raw_writer(writer._proc.stdin,depth) as pipe:
+                for i in frames:
+                    pipe.write(draw(i))
+        else:
+            for i in frames:
+                func(i)
+                writer.grab_frame(**savefig_kwargs)
+
+
+def start_worker():
+
+    ''' Worker initializer. FreeType fonts cannot be shared across fork. Matplotlib empties its font cache in a
+        forked child, but parsed math text cached by a parent that has already drawn still refers to the parent's
+        fonts, and workers drawing with them concurrently get corrupted glyphs.'''
+
+    matplotlib.mathtext.MathTextParser._parse_cached.cache_clear()
+
+
+def render_chunk(job):
+
+    ''' Worker: draws one chunk of frames on the worker's copy of the figure and writes it losslessly to path.'''
+
+    frames,path = job
+    fig,func,fps,dpi,savefig_kwargs,blit,raw,depth = _scene
+
+    # PNG frames keep the RGBA pixels exact so the final encode sees the same input as a serial render. The chunk
+    # is renamed to path only when it is complete
+    part = os.path.splitext(path)[0]+'.part.nut'
+    draw_frames(fig,func,frames,animation.FFMpegWriter(fps=fps,codec='png'),part,dpi,savefig_kwargs,blit,raw,depth)
+    os.replace(part,path)
+    return len(frames)
+
+
+def write_atomic(path,text):
+
+    ''' Writes text to path so that path either keeps its old contents or has all of text.'''
+
+    part = path+'.part'
+    with open(part,'w') as f:
+        f.write(text)
+    os.replace(part,path)
+
+
+def checkpoint_jobs(frames,directory,segment,settings):
+
+    ''' Returns the (frames,path) jobs of a checkpointed render: the frames split into segments of segment frames,
+        each written to its own file in directory.
+
+        The manifest in directory records the frames, the segment size and the settings that change the pixels,
+        including the hashes of the script and of the matplotlib rcParams.
+        Segment files left by an earlier run with the same manifest are kept; otherwise they are deleted and a new
+        manifest is written.'''
+
+    os.makedirs(directory,exist_ok=True)
+    names = ['segment_%05d.nut' % c for c in range(-(-len(frames)//segment))]
+    manifest = dict(settings,frames=len(frames),frames_sha1=hashlib.sha1(repr(frames).encode()).hexdigest(),
+                    segment=segment,segments=names)
+
+    path = os.path.join(directory,'manifest.json')
+    try:
+        with open(path) as f:
+            previous = json.load(f)
+    except (OSError,ValueError):
+        previous = None
+
+    if previous!=manifest:
+        for name in os.listdir(directory):
+            if name.endswith('.nut'):
+                os.remove(os.path.join(directory,name))
+        write_atomic(path,json.dumps(manifest,indent=2))
+
+    return [(frames[c*segment:(c+1)*segment],os.path.join(directory,name)) for c,name in enumerate(names)]
+
+
+def digest(value):
+
+    ''' Returns the hash of value as a hex string, hashed as by feed.'''
+
+    h = hashlib.sha1()
+    feed(h,value)
+    return h.hexdigest()
+
+
+def feed(h,value):
+
+    ''' Adds value to the hash h. Handles None, numbers, strings, ranges, arrays, pandas objects, matplotlib paths,
+        transforms, bounding boxes and font properties, and lists, tuples and dicts of these. Raises TypeError for
+        anything else.'''
+
+    if value is None or isinstance(value,(bool,int,float,complex,str,bytes,range,np.number,np.bool_)):
+        h.update(repr(value).encode())
+    elif isinstance(value,np.ndarray):
+        h.update(('array%s%r' % (value.dtype.str,value.shape)).encode())
+        if value.dtype==object:
+            for v in value.flat:
+                feed(h,v)
+        else:
+            h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value,(list,tuple)):
+        h.update(b'(%d' % len(value))
+        for v in value:
+            feed(h,v)
+    elif isinstance(value,dict):
+        h.update(b'{%d' % len(value))
+        for k in sorted(value,key=repr):
+            feed(h,k)
+            feed(h,value[k])
+    elif isinstance(value,mpath.Path):
+        feed(h,(value.vertices,value.codes))
+    elif isinstance(value,mtransforms.TransformedPath):
+        feed(h,value.get_transformed_path_and_affine())
+    elif isinstance(value,mtransforms.BboxBase):
+        feed(h,value.get_points())
+    elif isinstance(value,mtransforms.Transform):
+        feed(h,value.get_matrix() if value.is_affine else repr(value))
+    elif isinstance(value,FontProperties):
+        feed(h,(value.get_family(),value.get_style(),value.get_variant(),value.get_weight(),value.get_stretch(),
+                value.get_size_in_points(),value.get_file(),value.get_math_fontfamily()))
+    elif hasattr(value,'to_numpy') and hasattr(value,'ndim'):
+        # pandas Series, DataFrame and Index
+        feed(h,(type(value).__name__,value.to_numpy(),getattr(value,'name',None)))
+        if hasattr(value,'index'):
+            feed(h,value.index)
+        if hasattr(value,'columns'):
+            feed(h,value.columns)
+    else:
+        raise TypeError('cannot hash %s' % type(value).__name__)
+
+
+class fingerprint(RendererBase):
+
+    ''' A renderer that hashes the draw calls of a figure instead of rasterizing them. Frames with the same
+        fingerprint get the same pixels from Agg. Text is measured by an Agg renderer of the same size, so the layout
+        is the one Agg would draw.
+
+        Attributes:
+            width,height:   size of the canvas in pixels
+            dpi:            dots per inch
+            agg:            the Agg renderer used for text metrics
+            hash:           hash of the draw calls of the last figure'''
+
+    def __init__(self,width,height,dpi):
+
+        super().__init__()
+        self.width = width
+        self.height = height
+        self.dpi = dpi
+        self.agg = RendererAgg(width,height,dpi)
+        self.hash = hashlib.sha1()
+
+    def __call__(self,fig):
+
+        ''' Returns the fingerprint of fig as a hex string.'''
+
+        self.hash = hashlib.sha1()
+        fig.draw(self)
+        return self.hash.hexdigest()
+
+    def record(self,call,gc,*args):
+
+        gc_state = (gc.get_rgb(),gc.get_alpha(),gc.get_forced_alpha(),gc.get_antialiased(),gc.get_linewidth(),
+                    gc.get_dashes(),gc.get_capstyle(),gc.get_joinstyle(),gc.get_clip_rectangle(),gc.get_clip_path(),
+                    gc.get_hatch(),gc.get_hatch_color(),gc.get_hatch_linewidth(),gc.get_snap(),gc.get_sketch_params())
+        feed(self.hash,(call,gc_state,args))
+
+    def draw_path(self,gc,path,transform,rgbFace=None):
+        self.record('path',gc,path,transform,rgbFace)
+
+    def draw_markers(self,gc,marker_path,marker_trans,path,trans,rgbFace=None):
+        self.record('markers',gc,marker_path,marker_trans,path,trans,rgbFace)
+
+    def draw_path_collection(self,gc,master_transform,paths,all_transforms,offsets,offset_trans,facecolors,
+                             edgecolors,linewidths,linestyles,antialiaseds,urls,offset_position,*,hatchcolors=None):
+        self.record('collection',gc,master_transform,list(paths),all_transforms,offsets,offset_trans,facecolors,
+                    edgecolors,linewidths,linestyles,antialiaseds,offset_position,hatchcolors)
+
+    def draw_quad_mesh(self,gc,*args):
+        self.record('mesh',gc,*args)
+
+    def draw_gouraud_triangles(self,gc,*args):
+        self.record('gouraud',gc,*args)
+
+    def draw_image(self,gc,x,y,im,transform=None):
+        self.record('image',gc,x,y,im,transform)
+
+    def draw_text(self,gc,x,y,s,prop,angle,ismath=False,mtext=None):
+        self.record('text',gc,x,y,s,prop,angle,ismath)
+
+    def draw_tex(self,gc,x,y,s,prop,angle,*,mtext=None):
+        self.record('tex',gc,x,y,s,prop,angle)
+
+    def get_text_width_height_descent(self,s,prop,ismath):
+        return self.agg.get_text_width_height_descent(s,prop,ismath)
+
+    def get_canvas_width_height(self):
+        return self.width,self.height
+
+    def points_to_pixels(self,points):
+        return points*self.dpi/72
+
+    def option_image_nocomposite(self):
+        return True
+
+    def option_scale_image(self):
+        return True
+
+
+def script_digest(func,data=True):
+
+    ''' Returns a hash of the script that defines func: the source of every loaded module in the script's directory
+        (the script, local modules such as solow_model.py, and this file) and, with data=True, the script's
+        module-level data, i.e. parameters, arrays and pandas objects, including the attributes of instances of
+        classes from local modules.'''
+
+    module = sys.modules[func.__module__]
+    directory = os.path.dirname(os.path.abspath(module.__file__))
+    local = {name:m for name,m in sys.modules.items()
+             if getattr(m,'__file__',None) and os.path.dirname(os.path.abspath(m.__file__))==directory}
+
+    h = hashlib.sha1()
+    for name in sorted(local):
+        with open(local[name].__file__,'rb') as f:
+            h.update(f.read())
+
+    def value_digest(value):
+        if type(value).__module__ in local or type(value).__module__==module.__name__:
+            return {k:value_digest(v) for k,v in vars(value).items()}
+        return digest(value)
+
+    for name,value in sorted(vars(module).items()):
+        if name.startswith('_') or not data:
+            continue
+        try:
+            feed(h,(name,value_digest(value)))
+        except TypeError:
+            # functions, modules, figures and artists: their effect is in the source and the frame fingerprints
+            pass
+    return h.hexdigest()
+
+
+def cached_segment(job):
+
+    ''' Worker: fingerprints the frames of one segment and returns the path of the segment in the cache directory,
+        drawing and writing it first if the cache has no segment with the same fingerprints.'''
+
+    frames,directory,settings = job
+    fig,func,fps,dpi,savefig_kwargs,blit,raw,depth = _scene
+
+    # A full draw skips animated artists, which blitting an earlier segment may have left behind
+    animated = fig.findobj(lambda a: a.get_animated())
+    for artist in animated:
+        artist.set_animated(False)
+    fig.set_dpi(dpi)
+    draw = fingerprint(int(fig.bbox.width),int(fig.bbox.height),dpi)
+    h = hashlib.sha1(settings.encode())
+    for i in frames:
+        func(i)
+        h.update(draw(fig).encode())
+    for artist in animated:
+        artist.set_animated(True)
+
+    path = os.path.join(directory,h.hexdigest()+'.nut')
+    if not os.path.exists(path):
+        render_chunk((frames,path))
+    return path
+
+
+def concat(paths,writer):
+
+    ''' Joins the chunk files in paths with the ffmpeg concat demuxer and encodes them with writer.
+
+        The joined frames are decoded back to raw RGBA and piped into the same ffmpeg command that writer runs for a
+        serial render, so the encoder sees exactly the input it would have seen from FuncAnimation.save.'''
+
+    # A listing of its own, since the chunks may be segments in a cache shared with other renders
+    fd,listing = tempfile.mkstemp(prefix='.chunks-',suffix='.txt',dir=os.path.dirname(os.path.abspath(paths[0])))
+    with os.fdopen(fd,'w') as f:
+        for path in paths:
+            f.write("file '%s'\n" % os.path.abspath(path).replace("'","'\\''"))
+
+    try:
+        decode = [writer.bin_path(),'-loglevel','error','-f','concat','-safe','0','-i',listing,
+                  '-vf','setpts=N','-fps_mode','passthrough','-f','rawvideo','-pix_fmt',writer.frame_format,'pipe:']
+        with subprocess.Popen(decode,stdout=subprocess.PIPE) as source:
+            subprocess.run(writer._args(),stdin=source.stdout,check=True)
+        if source.returncode!=0:
+            raise subprocess.CalledProcessError(source.returncode,decode)
+    finally:
+        os.remove(listing)
+
+
+def chain_keys(*columns):
+
+    ''' Returns frame keys for a cumulative animation whose frame i shows rows 0 through i of the columns: the key of
+        row i hashes the row and the key of row i-1, so a frame keeps its key only if no earlier row changed.'''
+
+    keys,previous = [],''
+    for row in zip(*columns):
+        h = hashlib.sha1(previous.encode())
+        feed(h,row)
+        previous = h.hexdigest()
+        keys.append(previous)
+    return keys
+
+
+def append_movie(filename,part,writer):
+
+    ''' Appends the movie part to the movie filename without re-encoding. Both must come from the same writer
+        settings. The first frame of part is a keyframe, so its packets can follow those of filename as they are.'''
+
+    fd,listing = tempfile.mkstemp(prefix='.append-',suffix='.txt',dir=os.path.dirname(os.path.abspath(filename)))
+    with os.fdopen(fd,'w') as f:
+        for path in [filename,part]:
+            f.write("file '%s'\n" % os.path.abspath(path).replace("'","'\\''"))
+
+    root,ext = os.path.splitext(filename)
+    joined = root+'.joined'+ext
+    try:
+        metadata = [a for k,v in writer.metadata.items() for a in ['-metadata','%s=%s' % (k,v)]]
+        subprocess.run([writer.bin_path(),'-loglevel','error','-f','concat','-safe','0','-i',listing,
+                        '-c','copy']+metadata+['-y',joined],check=True)
+        os.replace(joined,filename)
+    finally:
+        os.remove(listing)
+        if os.path.exists(joined):
+            os.remove(joined)
+
+
+def render_appending(fig,func,frames,keys,filename,writer,init_func=None,dpi=None,**kwargs):
+
+    ''' Renders the animation like render(), extending an earlier render of the same movie if possible.
+
+        keys[i] must determine frame i given the script's code, e.g. the date and data of the observation it shows.
+        A manifest next to the movie records the keys of its frames and a hash of the script's code and the writer
+        and frame settings. If those match and the recorded keys are a prefix of keys, only the new frames are
+        rendered, to a separate file, which is joined to the end of the movie. Otherwise the whole movie is
+        rendered. A multi_writer's renditions are always rendered in full.'''
+
+    keys = [digest(k) for k in keys]
+    if len(keys)!=len(frames):
+        raise ValueError('keys must have one entry per frame')
+
+    writer.outfile = filename
+    dpi,savefig_kwargs = save_settings(fig,dpi,writer._supports_transparency())
+    writer.fig,writer.dpi = fig,dpi
+    writer._adjust_frame_size()
+    h = hashlib.sha1()
+    feed(h,(script_digest(func,data=False),[a for a in writer._args() if a!=filename],dpi,fig.get_size_inches(),
+            np.asarray(savefig_kwargs.get('facecolor',[])),kwargs.get('blit',False),matplotlib.__version__,
+            repr(sorted(matplotlib.rcParams.items()))))
+    manifest = dict(settings=h.hexdigest(),keys=keys)
+
+    path = os.path.splitext(filename)[0]+'.frames.json'
+    try:
+        with open(path) as f:
+            previous = json.load(f)
+    except (OSError,ValueError):
+        previous = None
+
+    old = previous['keys'] if previous is not None and previous['settings']==manifest['settings'] else None
+    if (old is not None and os.path.exists(filename) and len(old)<=len(keys) and keys[:len(old)]==old
+            and not getattr(writer,'renditions',None)):
+        if len(old)<len(keys):
+            root,ext = os.path.splitext(filename)
+            part = root+'.new'+ext
+            kwargs.pop('cache',None)
+            kwargs.pop('checkpoint',None)
+            render(fig,func,frames[len(old):],part,writer,init_func=init_func,dpi=dpi,**kwargs)
+            try:
+                append_movie(filename,part,writer)
+            finally:
+                os.remove(part)
+    else:
+        render(fig,func,frames,filename,writer,init_func=init_func,dpi=dpi,**kwargs)
+
+    write_atomic(path,json.dumps(manifest))
+
+
+def render(fig,func,frames,filename,writer,processes=None,chunks=None,init_func=None,dpi=None,blit=False,raw=False,depth=4,
+           checkpoint=None,segment=500,cache=None):
+
+    ''' Renders the animation of fig drawn by func over frames to filename using a pool of worker processes.
+
+        Args:
+            fig:        the figure
+            func:       function func(i) that draws frame i. Must be a pure function of i
+            frames:     iterable of frame indices passed to func
+            filename:   output movie file
+            writer:     an animation.FFMpegWriter with the fps, codec, bitrate and metadata of the output
+            processes:  number of worker processes. Default: os.cpu_count()
+            chunks:     number of chunks the frames are split into. Default: 4 per process
+            init_func:  optional function called once before any frames are drawn
+            dpi:        dots per inch of the frames. Default: rcParams['savefig.dpi']
+            blit:       if True, draw the static layer once per chunk and redraw only the artists func returns
+            raw:        if True, write the canvas pixels to ffmpeg from a writer thread instead of using savefig
+            depth:      number of frames queued for the writer thread with blit or raw. 0 writes without copying
+            checkpoint: directory for the segments of a resumable render, or True for filename without its
+                        extension plus '.segments'. Removed when the movie is written. Default: no checkpoints
+            segment:    number of frames per segment of a checkpointed or cached render. Replaces chunks
+            cache:      directory of a render cache, or True for .render-cache in the directory of filename.
+                        Checkpoints are not needed with a cache, whose segments are kept. Default: no cache
+
+        Returns:
+            None'''
+
+    global _scene
+
+    frames = list(frames)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if chunks is None:
+        chunks = 4*processes
+    chunks = max(min(chunks,len(frames)),1)
+
+    # The writer chooses codec arguments and transparency from the output file name and its frame size from the figure
+    writer.outfile = filename
+    dpi,savefig_kwargs = save_settings(fig,dpi,writer._supports_transparency())
+    if init_func is not None:
+        init_func()
+
+    # A single process or a platform without fork draws the frames directly, or the segments one after another
+    serial = processes==1 or 'fork' not in multiprocessing.get_all_start_methods()
+    if serial and checkpoint is None and cache is None:
+        draw_frames(fig,func,frames,writer,filename,dpi,savefig_kwargs,blit,raw,depth)
+        return
+
+    # The frame size the writer will use, rounded to even pixels, before anything is drawn or hashed
+    writer.fig,writer.dpi = fig,dpi
+    writer._adjust_frame_size()
+    settings = dict(fps=writer.fps,dpi=dpi,size=fig.get_size_inches().tolist(),blit=blit,
+                    facecolor=np.asarray(savefig_kwargs.get('facecolor',[])).tolist())
+
+    if cache is not None:
+        directory = os.path.join(os.path.dirname(os.path.abspath(filename)),'.render-cache') if cache is True else cache
+        outputs = [filename]+[r.filename for r in getattr(writer,'renditions',[])]
+        key = hashlib.sha1()
+        feed(key,(script_digest(func),[a for a in writer._args() if a not in outputs],[os.path.splitext(f)[1] for f in outputs],
+                  repr(frames),settings,matplotlib.__version__,repr(sorted(matplotlib.rcParams.items()))))
+        stored = [os.path.join(directory,'videos',key.hexdigest(),'%d%s' % (k,os.path.splitext(f)[1])) for k,f in enumerate(outputs)]
+        if all(os.path.exists(path) for path in stored):
+            for path,output in zip(stored,outputs):
+                shutil.copyfile(path,output)
+            return
+        os.makedirs(os.path.join(directory,'segments'),exist_ok=True)
+        segment_settings = json.dumps(dict(settings,version=matplotlib.__version__),sort_keys=True)
+        jobs = [(frames[c:c+segment],os.path.join(directory,'segments'),segment_settings) for c in range(0,len(frames),segment)]
+        work = cached_segment
+    elif checkpoint is None:
+        directory = tempfile.mkdtemp(prefix='.render-',dir=os.path.dirname(os.path.abspath(filename)))
+        jobs = [([frames[j] for j in block],os.path.join(directory,'chunk_%05d.nut' % c)) for c,block in enumerate(np.array_split(np.arange(len(frames)),chunks))]
+        work = render_chunk
+    else:
+        directory = os.path.splitext(filename)[0]+'.segments' if checkpoint is True else checkpoint
+        # Segments drawn by an edited script or with other matplotlib settings are not reused, as in the cache key
+        jobs = checkpoint_jobs(frames,directory,segment,dict(settings,script=script_digest(func),version=matplotlib.__version__,
+                                                             rcparams=digest(repr(sorted(matplotlib.rcParams.items())))))
+        work = render_chunk
+
+    done = False
+    try:
+        # Cached segments are looked up by the workers; other chunks are skipped here if they exist
+        todo = jobs if cache is not None else [job for job in jobs if not os.path.exists(job[1])]
+        _scene = (fig,func,writer.fps,dpi,savefig_kwargs,blit,raw,depth)
+        if serial:
+            paths = [work(job) for job in todo]
+        elif todo:
+            with multiprocessing.get_context('fork').Pool(min(processes,len(todo)),start_worker) as pool:
+                paths = pool.map(work,todo,chunksize=1)
+        if cache is None:
+            paths = [job[1] for job in jobs]
+        concat(paths,writer)
+        done = True
+    finally:
+        _scene = None
+        # Segments of a checkpointed render are kept until the movie is written; cached ones are kept
+        if cache is None and (checkpoint is None or done):
+            shutil.rmtree(directory,ignore_errors=True)
+
+    if cache is not None:
+        for path,output in zip(stored,outputs):
+            os.makedirs(os.path.dirname(path),exist_ok=True)
+            shutil.copyfile(output,path+'.part')
+            os.replace(path+'.part',path)
+
+
+class scene:
+
+    ''' An animation script as a figure and a pure function of the frame index.
+
+        The script builds its figure when it is imported, defines the function that draws a frame and a list of
+        frames, and renders only when run as __main__. Importing it is the setup; after that any frame can be drawn
+        in any order.
+
+        Attributes:
+            module:         name of the script module
+            func_name:      name of the function that draws a frame
+            init_name:      name of an optional function called once before the first frame
+            fig:            the figure (after setup)
+            func:           the function that draws a frame (after setup)
+            frames:         list of values passed to func, one per movie frame (after setup)
+            dpi:            dots per inch of the frames
+            savefig_kwargs: keyword arguments for savefig matching the frames of an mp4 render
+            blit:           if True, frames are drawn on a cached static layer (see blitter)'''
+
+    def __init__(self,module,func='run',init_func=None,dpi=None,blit=False):
+
+        self.module = module
+        self.func_name = func
+        self.init_name = init_func
+        self.dpi = dpi
+        self.blit = blit
+        self.fig = None
+
+    def setup(self):
+
+        ''' Imports the script, which builds the figure, and looks up the frame function and the frames.'''
+
+        mod = importlib.import_module(self.module)
+        self.fig = mod.fig
+        self.func = getattr(mod,self.func_name)
+        self.frames = list(mod.frames)
+        self.dpi,self.savefig_kwargs = save_settings(self.fig,self.dpi)
+        if self.init_name is not None:
+            getattr(mod,self.init_name)()
+        if self.blit:
+            self.start_blit()
+
+    def start_blit(self):
+
+        ''' Switches the scene to blitted drawing. The figure's dynamic artists stay marked animated afterwards.'''
+
+        self.blit = True
+        self.draw = blitter(self.fig,self.func,self.frames[0],self.dpi,self.savefig_kwargs.get('facecolor'))
+
+    def __len__(self):
+
+        if self.fig is None:
+            self.setup()
+        return len(self.frames)
+
+    def render_frame(self,i):
+
+        ''' Returns movie frame i as a (height,width,4) uint8 RGBA array, the same pixels the movie writer
+            receives for that frame. The result does not depend on which frames were drawn before.'''
+
+        if self.fig is None:
+            self.setup()
+        if self.blit:
+            return np.array(self.draw(self.frames[i]))
+
+        self.func(self.frames[i])
+        self.fig.savefig(io.BytesIO(),format='rgba',dpi=self.dpi,**self.savefig_kwargs)
+        return np.array(self.fig.canvas.renderer.buffer_rgba())
+
+    def save_frame(self,i,filename):
+
+        ''' Saves movie frame i to an image file, e.g. a poster or thumbnail.'''
+
+        matplotlib.image.imsave(filename,self.render_frame(i))
+
+    def save(self,filename,writer,**kwargs):
+
+        ''' Renders all frames to filename with writer. Keyword arguments are passed to render().'''
+
+        if self.fig is None:
+            self.setup()
+        render(self.fig,self.func,self.frames,filename,writer,dpi=self.dpi,blit=self.blit,**kwargs)
+
+
+def blit_savings(s,samples=10):
+
+    ''' Times every frame of scene s drawn in full and then blitted, and compares the pixels of a sample of frames.
+        Leaves s in blitted mode.
+
+        Returns:
+            dict with the number of frames, the mean seconds per frame for full and blitted drawing, the speedup
+            and the largest number of pixels that differ between the two in a sampled frame'''
+
+    if s.fig is None:
+        s.setup()
+    if s.blit:
+        raise ValueError('the scene is already blitted')
+
+    n = len(s)
+    sample = set(np.linspace(0,n-1,min(samples,n)).round().astype(int).tolist())
+    full,blit,reference,differ = np.zeros(n),np.zeros(n),{},0
+
+    for j in range(n):
+        start = time.perf_counter()
+        pixels = s.render_frame(j)
+        full[j] = time.perf_counter()-start
+        if j in sample:
+            reference[j] = pixels
+
+    s.start_blit()
+    for j in range(n):
+        start = time.perf_counter()
+        pixels = s.render_frame(j)
+        blit[j] = time.perf_counter()-start
+        if j in reference:
+            differ = max(differ,int(np.any(pixels!=reference[j],axis=2).sum()))
+
+    return dict(frames=n,full=full.mean(),blit=blit.mean(),speedup=full.mean()/blit.mean(),max_pixels_differing=differ)
+
+
+def cold_frame(i):
+
+    ''' Worker: returns the hash of the pixels of frame i of the checked scene, drawn by a process that has drawn no
+        other frame.'''
+
+    return hashlib.sha1(_checked.render_frame(i).tobytes()).hexdigest()
+
+
+def order_check(s,samples=15,processes=None):
+
+    ''' Draws every frame of scene s in order and in reverse order, and a sample of frames each in a new process
+        that has drawn nothing before, and compares the pixels. A frame function that depends only on the frame
+        index gives the same pixels every time; one that relies on state left by earlier frames does not.
+
+        Returns:
+            dict with the number of frames, the frames that differ between the forward and reverse passes and the
+            sampled frames that differ between the forward pass and a cold draw'''
+
+    global _checked
+
+    if s.fig is None:
+        s.setup()
+    n = len(s)
+    sample = sorted(set(np.linspace(0,n-1,min(samples,n)).round().astype(int).tolist()))
+
+    # Cold draws first, each in a process forked from this one before it draws any frame
+    _checked = s
+    with multiprocessing.get_context('fork').Pool(processes or os.cpu_count() or 1,start_worker,maxtasksperchild=1) as pool:
+        cold = dict(zip(sample,pool.map(cold_frame,sample,chunksize=1)))
+
+    forward = [hashlib.sha1(s.render_frame(j).tobytes()).hexdigest() for j in range(n)]
+    reverse = [hashlib.sha1(s.render_frame(j).tobytes()).hexdigest() for j in reversed(range(n))][::-1]
+
+    return dict(frames=n,reverse_differs=[j for j in range(n) if forward[j]!=reverse[j]],
+                cold_differs=[j for j in sample if forward[j]!=cold[j]],cold_sampled=len(sample))
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Saves single frames of an animation script, reports the savings from blitting or checks that frames do not depend on drawing order.')
+    parser.add_argument('module',help='animation script without .py, e.g. increase_tfp')
+    parser.add_argument('frames',type=int,nargs='*',help='movie frame numbers, counting from 0')
+    parser.add_argument('--func',default='run',help='name of the function that draws a frame')
+    parser.add_argument('--output',default='{module}_{frame:05d}.png',help='file name pattern')
+    parser.add_argument('--blit',action='store_true',help='draw frames on a cached static layer')
+    parser.add_argument('--blit-report',action='store_true',help='print per-frame draw times with and without blitting')
+    parser.add_argument('--order-check',action='store_true',help='check that frames are the same drawn in any order')
+    args = parser.parse_args()
+
+    s = scene(args.module,func=args.func,blit=args.blit)
+    for i in args.frames:
+        s.save_frame(i,args.output.format(module=args.module,frame=i))
+
+    if args.blit_report:
+        report = blit_savings(s)
+        print('%s: %d frames, full %.2f ms, blit %.2f ms per frame (%.1fx), at most %d pixels differ' %
+              (args.module,report['frames'],1000*report['full'],1000*report['blit'],report['speedup'],report['max_pixels_differing']))
+
+    if args.order_check:
+        report = order_check(s)
+        print('%s: %d frames, %d differ in reverse order, %d of %d sampled differ when drawn cold' %
+              (args.module,report['frames'],len(report['reverse_differs']),len(report['cold_differs']),report['cold_sampled']))
@@ -11,6 +11,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import fredpy as fp
+import fred_cache
 plt.style.use('classic')
 plt.rcParams['figure.facecolor'] = 'white'
 
@@ -28,9 +29,9 @@ plt.rcParams['figure.facecolor'] = 'white'
 # In[2]:
 
 
-# Dowload data
-u = fp.series('LNS14000028')
-p = fp.series('CPIAUCSL')
+# Download data, or read it from the cache in ../.fred-cache when it was downloaded less than a day ago
+u = fred_cache.series('LNS14000028')
+p = fred_cache.series('CPIAUCSL')
 
 # Construct the inflation series
 p = p.pc(annualized=True)
@@ -6,13 +6,11 @@ import matplotlib.animation as animation
 import matplotlib.patches as patches
 import matplotlib.path as path
 import subprocess
+import os
+import renderer
 
 plt.style.use('classic')
 
-# Make directories for output if they don't exist
-if not os.path.isdir('../video'):
-    os.mkdir('../video')
-
 # Parameters for animation
 aL=4
 cH=0.25
@@ -60,10 +58,6 @@ yMinL,yMaxL = -10,15
 ##########################################
 
 
-# Set up formatting for the movie files
-Writer = animation.writers['ffmpeg']
-writer = Writer(fps=6, metadata=dict(artist='Brian C Jenkins'), bitrate=5000)
-
 fig = plt.figure(figsize=(16,9))
 ax1 = fig.add_subplot(2, 1, 1)
 ax1.grid()
@@ -148,9 +142,9 @@ fig.tight_layout()
 fig.subplots_adjust(hspace=.25)
 
 #############
-z,n=10000,0
-def run(*args):
-    global z,n
+def run(n):
+
+    ''' Draws the animation at education level eRange[n].'''
 
     e1 = 0.25
 
@@ -283,13 +277,6 @@ def run(*args):
     utilH4=uLowH[n]
     utilL3=utilL[n]
     utilL4=uLowL[n]
-    # fig.savefig("%d.png"%z)
-    z+=1
-    if n==len(eRange)-1:
-        n=0
-        n = len(eRange)-1
-    else:
-        n+=1
     
     ax1.set_xticklabels(xlabelsH,fontsize=20)
     ax1.set_yticklabels(ylabelsH,fontsize=20)
@@ -301,17 +288,29 @@ def run(*args):
     ax2.set_ylim(yMinL,yMaxL)
     lineH1.set_data(eRange1, utilH1)
     lineH2.set_data(eRange2, utilH2)
-    lineH3.set_data(eRange3, utilH3)
-    lineH4.set_data(eRange3, utilH4)
+    lineH3.set_data([eRange3], [utilH3])
+    lineH4.set_data([eRange3], [utilH4])
     lineL1.set_data(eRange1, utilL1)
     lineL2.set_data(eRange2, utilL2)
-    lineL3.set_data(eRange3, utilL3)
-    lineL4.set_data(eRange3, utilL4)
-    return lineH1,lineH2,lineH3,lineH4,lineL1,lineL2,lineL3,lineL4
+    lineL3.set_data([eRange3], [utilL3])
+    lineL4.set_data([eRange3], [utilL4])
+    return lineH1,lineH2,lineH3,lineH4,lineL1,lineL2,lineL3,lineL4,ax1.patches,ax2.patches,ax1.xaxis,ax1.yaxis,ax2.xaxis,ax2.yaxis
+
+# Levels 1 through len(eRange)-1 with the last level held for one more frame, the frames of the original
+# FuncAnimation whose first call went to the initial draw
+frames = list(range(1,len(eRange)))+[len(eRange)-1]
+
+
+if __name__ == '__main__':
+
+    # Make directories for output if they don't exist
+    if not os.path.isdir('../video'):
+        os.mkdir('../video')
 
-ani = animation.FuncAnimation(fig, run, eRange, blit=False,repeat=True,interval=1)
-ani.save('../video/signaling_pooling.mp4',writer=writer)
+    # Set up formatting for the movie files
+    Writer = animation.writers['ffmpeg']
+    writer = Writer(fps=6, metadata=dict(artist='Brian C Jenkins'), bitrate=5000)
+    renderer.render(fig, run, frames, '../video/signaling_pooling.mp4', writer, cache=True)
 
-# # Convert the mp4 video to ogg format
-# makeOgg = 'ffmpeg -i ../video/signalingPooling.mp4 -c:v libtheora -c:a libvorbis -q:v 8 -q:a 5 ../video/signalingPooling.ogv'
-# subprocess.call(makeOgg,shell=True)
\ No newline at end of file
+# # Also write the ogg video from the same frames, without a transcode pass, with this writer
+# writer = renderer.multi_writer([renderer.rendition('../video/signalingPooling.ogv',bitrate=0,args=['-q:v','8'])], fps=6, metadata=dict(artist='Brian C Jenkins'), bitrate=5000)
\ No newline at end of file
@@ -6,13 +6,11 @@ import matplotlib.animation as animation
 import matplotlib.patches as patches
 import matplotlib.path as path
 import subprocess
+import os
+import renderer
 
 plt.style.use('classic')
 
-# Make directories for output if they don't exist
-if not os.path.isdir('../video'):
-    os.mkdir('../video')
-
 # Parameters for animation
 aL=4
 cH=0.25
@@ -60,10 +58,6 @@ yMinL,yMaxL = -10,33
 ##########################################
 
 
-# Set up formatting for the movie files
-Writer = animation.writers['ffmpeg']
-writer = Writer(fps=6, metadata=dict(artist='Brian C Jenkins'), bitrate=5000)
-
 fig = plt.figure(figsize=(16,9))
 ax1 = fig.add_subplot(2, 1, 1)
 ax1.grid()
@@ -144,9 +138,9 @@ fig.tight_layout()
 fig.subplots_adjust(hspace=.25)
 
 ##########################################
-z,n=10000,0
-def run(*args):
-    global z,n
+def run(n):
+
+    ''' Draws the animation at education level eRange[n].'''
 
     e1 = 0.25
 
@@ -180,14 +174,14 @@ def run(*args):
         xlabelsH  = ['$e_H^*$','$\\bar{e}_{max}$','$\\bar{e}$'] #% np.round(eRange[n],1)
         ylabelsH  = ['','$u_H(e_H^*)$','$u_H(\\bar{e})$'] #% np.round(eRange[n],1)
 
-    if e<=eHmax:
-
-        leftH = 0
-        rightH = e
-        vertsH[0,0] = leftH
-        vertsH[1,0] = leftH
-        vertsH[2,0] = rightH
-        vertsH[3,0] = rightH
+    # The shaded region runs from 0 to e and stops growing at eHmax. All four x-vertices are set in every frame so
+    # that the rectangle depends only on n
+    leftH = 0
+    rightH = min(e,eHmax)
+    vertsH[0,0] = leftH
+    vertsH[1,0] = leftH
+    vertsH[2,0] = rightH
+    vertsH[3,0] = rightH
 
     if e<e1:
         ax2.set_xticks([eRange[n]])
@@ -210,12 +204,17 @@ def run(*args):
         xlabelsL  = ['$e_L^*$','$\\bar{e}_{min}$','$\\bar{e}$'] #% np.round(eRange[n],1)
         ylabelsL  = ['','$u_L(e_L^*)$','$u_L(\\bar{e})$'] #% np.round(eRange[n],1)
 
+    # The shaded region appears once e reaches eLmax and runs from eLmax to e. All four x-vertices are set in every
+    # frame so that the rectangle depends only on n
+    if e<eLmax:
+        leftL = rightL = 0
+    else:
         leftL = eLmax
         rightL = e
-        vertsL[0,0] = leftL
-        vertsL[1,0] = leftL
-        vertsL[2,0] = rightL
-        vertsL[3,0] = rightL
+    vertsL[0,0] = leftL
+    vertsL[1,0] = leftL
+    vertsL[2,0] = rightL
+    vertsL[3,0] = rightL
 
     eRange1=eRange[0:n]
     utilH1 = utilH[:n]
@@ -228,13 +227,6 @@ def run(*args):
     utilH4=uLowH[n]
     utilL3=utilL[n]
     utilL4=uLowL[n]
-    # fig.savefig("%d.png"%z)
-    z+=1
-    if n==len(eRange)-1:
-        n=0
-        n = len(eRange)-1
-    else:
-        n+=1
     
     ax1.set_xticklabels(xlabelsH,fontsize=20)
     ax1.set_yticklabels(ylabelsH,fontsize=20)
@@ -244,17 +236,29 @@ def run(*args):
     ax2.set_ylim(yMinL,yMaxL)
     lineH1.set_data(eRange1, utilH1)
     lineH2.set_data(eRange2, utilH2)
-    lineH3.set_data(eRange3, utilH3)
-    lineH4.set_data(eRange3, utilH4)
+    lineH3.set_data([eRange3], [utilH3])
+    lineH4.set_data([eRange3], [utilH4])
     lineL1.set_data(eRange1, utilL1)
     lineL2.set_data(eRange2, utilL2)
-    lineL3.set_data(eRange3, utilL3)
-    lineL4.set_data(eRange3, utilL4)
-    return lineH1,lineH2,lineH3,lineH4,lineL1,lineL2,lineL3,lineL4
+    lineL3.set_data([eRange3], [utilL3])
+    lineL4.set_data([eRange3], [utilL4])
+    return lineH1,lineH2,lineH3,lineH4,lineL1,lineL2,lineL3,lineL4,ax1.patches,ax2.patches,ax1.xaxis,ax1.yaxis,ax2.xaxis,ax2.yaxis
+
+# Levels 1 through len(eRange)-1 with the last level held for one more frame, the frames of the original
+# FuncAnimation whose first call went to the initial draw
+frames = list(range(1,len(eRange)))+[len(eRange)-1]
+
+
+if __name__ == '__main__':
+
+    # Make directories for output if they don't exist
+    if not os.path.isdir('../video'):
+        os.mkdir('../video')
 
-ani = animation.FuncAnimation(fig, run, eRange, blit=False,repeat=True,interval=1)
-ani.save('../video/signaling_separating.mp4',writer=writer)
+    # Set up formatting for the movie files
+    Writer = animation.writers['ffmpeg']
+    writer = Writer(fps=6, metadata=dict(artist='Brian C Jenkins'), bitrate=5000)
+    renderer.render(fig, run, frames, '../video/signaling_separating.mp4', writer, cache=True)
 
-# # Convert the mp4 video to ogg format
-# makeOgg = 'ffmpeg -i ../video/signaling_separating_low_type.mp4 -c:v libtheora -c:a libvorbis -q:v 6 -q:a 5 ../video/signalingSeparating.ogv'
-# subprocess.call(makeOgg,shell=True)
\ No newline at end of file
+# # Also write the ogg video from the same frames, without a transcode pass, with this writer
+# writer = renderer.multi_writer([renderer.rendition('../video/signalingSeparating.ogv',bitrate=0,args=['-q:v','6'])], fps=6, metadata=dict(artist='Brian C Jenkins'), bitrate=5000)
\ No newline at end of file
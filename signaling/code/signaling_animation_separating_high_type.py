@@ -7,13 +7,11 @@ import matplotlib.animation as animation
 import matplotlib.patches as patches
 import matplotlib.path as path
 import subprocess
+import os
+import renderer
 
 plt.style.use('classic')
 
-# Make directories for output if they don't exist
-if not os.path.isdir('../video'):
-    os.mkdir('../video')
-
 # Parameters for animation
 aL=4
 cH=0.25
@@ -47,10 +45,6 @@ yMinH,yMaxH = -10,65
 ##########################################
 
 
-# Set up formatting for the movie files
-Writer = animation.writers['ffmpeg']
-writer = Writer(fps=6, metadata=dict(artist='Brian C Jenkins'), bitrate=1000)
-
 fig = plt.figure(figsize=(16,9))
 ax1 = fig.add_subplot(1, 1, 1)
 ax1.grid()
@@ -95,9 +89,9 @@ ax1.add_patch(patch)
 fig.tight_layout()
 
 ##########################################
-z,n=10000,0
-def run(*args):
-    global z,n
+def run(n):
+
+    ''' Draws the animation at education level eRange[n].'''
 
     e1 = 0.25
 
@@ -130,14 +124,14 @@ def run(*args):
         ylabels  = ['','$u_H(e_H^*)$','$u_H(\\bar{e})$'] #% np.round(eRange[n],1)
 
 
-    if e<=eHmax:
-
-        leftH = 0
-        rightH = e
-        vertsH[0,0] = leftH
-        vertsH[1,0] = leftH
-        vertsH[2,0] = rightH
-        vertsH[3,0] = rightH
+    # The shaded region runs from 0 to e and stops growing at eHmax. All four x-vertices are set in every frame so
+    # that the rectangle depends only on n
+    leftH = 0
+    rightH = min(e,eHmax)
+    vertsH[0,0] = leftH
+    vertsH[1,0] = leftH
+    vertsH[2,0] = rightH
+    vertsH[3,0] = rightH
     
     eRange1=eRange[0:n]
     util1 = util[:n]
@@ -145,24 +139,29 @@ def run(*args):
     util2 = util[n:]
     eRange3=eRange[n]
     util3=util[n]
-    # fig.savefig("%d.png"%z)
-    z+=1
-    if n==len(eRange)-1:
-        n=0
-        n = len(eRange)-1
-    else:
-        n+=1
     
     ax1.set_xticklabels(xlabels,fontsize=20)
     ax1.set_yticklabels(ylabels,fontsize=20)
     line1.set_data(eRange1, util1)
     line2.set_data(eRange2, util2)
-    line3.set_data(eRange3, util3)
-    return line1,line2,line3
+    line3.set_data([eRange3], [util3])
+    return line1,line2,line3,ax1.patches,ax1.xaxis,ax1.yaxis
+
+# Levels 1 through len(eRange)-1 with the last level held for one more frame, the frames of the original
+# FuncAnimation whose first call went to the initial draw
+frames = list(range(1,len(eRange)))+[len(eRange)-1]
+
+
+if __name__ == '__main__':
+
+    # Make directories for output if they don't exist
+    if not os.path.isdir('../video'):
+        os.mkdir('../video')
 
-ani = animation.FuncAnimation(fig, run, eRange, blit=False,repeat=True,interval=1)
-ani.save('../video/signaling_separating_high_type.mp4',writer=writer)
+    # Set up formatting for the movie files
+    Writer = animation.writers['ffmpeg']
+    writer = Writer(fps=6, metadata=dict(artist='Brian C Jenkins'), bitrate=1000)
+    renderer.render(fig, run, frames, '../video/signaling_separating_high_type.mp4', writer, cache=True)
 
-# # Convert the mp4 video to ogg format
-# makeOgg = 'ffmpeg -i ../video/signaling_separating_high_type.mp4 -c:v libtheora -c:a libvorbis -q:v 6 -q:a 5 ../video/signalingSeparatingHigh.ogv'
-# subprocess.call(makeOgg,shell=True)
\ No newline at end of file
+# # Also write the ogg video from the same frames, without a transcode pass, with this writer
+# writer = renderer.multi_writer([renderer.rendition('../video/signalingSeparatingHigh.ogv',bitrate=0,args=['-q:v','6'])], fps=6, metadata=dict(artist='Brian C Jenkins'), bitrate=1000)
\ No newline at end of file
@@ -0,0 +1,355 @@
+# Benchmarks for the solow class in solow_model.py and the solow animation scripts. Run from this directory:
+#
+#     python benchmark_solow.py [--output benchmark_results.json] [--label LABEL] [--compare OLD.json]
+#
+# Results are written to JSON so that runs from different versions can be compared.
+
+import argparse
+import datetime
+import importlib
+import json
+import platform
+import sys
+import time
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import renderer
+from solow_model import solow, solow_batch, solow_stochastic, path_series, steady_state, steady_state_bulk
+
+
+def best_time(func,repeat=3):
+
+    ''' Returns the fastest of repeat calls to func in seconds.'''
+
+    times = []
+    for r in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter()-start)
+    return min(times)
+
+
+def bench_eval(M_values=[1,10**3,10**5],repeat=100):
+
+    ''' Times solow.eval and solow_batch.eval including the lazily computed levels and growth rates.'''
+
+    print('eval: effective quantities only vs effective quantities, levels and growth rates')
+    print('%10s %12s %12s' % ('M','eval (s)','all (s)'))
+
+    results = []
+    for M in M_values:
+        if M==1:
+            model = solow()
+        else:
+            model = solow_batch(s=np.linspace(0.05,0.4,M))
+
+        def run(read):
+            for r in range(repeat):
+                model.eval(k0=0.5)
+                for name in read:
+                    getattr(model,name)
+
+        t_eval = best_time(lambda: run([]))/repeat
+        t_all  = best_time(lambda: run(['k','y','c','i','K','Y','C','I','gk','gy','gc','gi','gK','gY','gC','gI']))/repeat
+        print('%10d %12.7f %12.7f' % (M,t_eval,t_all))
+        results.append(dict(M=M,eval=t_eval,all=t_all))
+
+    return results
+
+
+def bench_transpath(T_values=[10**2,10**3,10**4,10**5]):
+
+    ''' Times the array and list engines of solow.transpath over a range of horizons.'''
+
+    print('transpath: array engine vs list engine')
+    print('%10s %12s %12s %8s' % ('T','array (s)','list (s)','speedup'))
+
+    results = []
+    for T in T_values:
+        def run(engine):
+            model = solow()
+            model.eval(k0=0.1)
+            # Levels overflow for the longest horizons
+            with np.errstate(over='ignore'):
+                model.transpath(T=T,A1=1.5,t0=10,engine=engine)
+            return model
+
+        # The two engines must agree exactly
+        a,b = run('array'),run('list')
+        with np.errstate(over='ignore'):
+            for name in path_series:
+                assert np.array_equal(getattr(a,name+'_trans'),getattr(b,name+'_trans')), name
+
+        t_array = best_time(lambda: run('array'))
+        t_list  = best_time(lambda: run('list'))
+        print('%10d %12.5f %12.5f %8.1f' % (T,t_array,t_list,t_list/t_array))
+        results.append(dict(T=T,array=t_array,list=t_list))
+
+    return results
+
+
+def bench_batch(M_values=[10**2,10**3,10**4],T=100):
+
+    ''' Times solow_batch against a loop over solow instances for parameter grids of size M.'''
+
+    print('transpath: solow_batch vs loop over solow (T=%d)' % T)
+    print('%10s %12s %12s %8s' % ('M','batch (s)','loop (s)','speedup'))
+
+    results = []
+    for M in M_values:
+        rng = np.random.default_rng(0)
+        alpha = rng.uniform(0.2,0.5,M)
+        s = rng.uniform(0.05,0.4,M)
+
+        def run_batch():
+            model = solow_batch(alpha=alpha,s=s)
+            model.eval(k0=0.5)
+            model.transpath(T=T,A1=1.5,t0=10)
+            return model
+
+        def run_loop():
+            models = []
+            for j in range(M):
+                model = solow(alpha=alpha[j],s=s[j])
+                model.eval(k0=0.5)
+                model.transpath(T=T,A1=1.5,t0=10)
+                models.append(model)
+            return models
+
+        t_batch = best_time(run_batch)
+        t_loop  = best_time(run_loop,repeat=1)
+        print('%10d %12.5f %12.5f %8.1f' % (M,t_batch,t_loop,t_loop/t_batch))
+        results.append(dict(M=M,T=T,batch=t_batch,loop=t_loop))
+
+    return results
+
+
+def bench_closed_form(T_values=[10**3,10**4,10**5],samples=100):
+
+    ''' Times solow.closed_form_path against transpath when only a sparse set of periods is needed.'''
+
+    print('closed_form_path vs transpath (%d sampled periods)' % samples)
+    print('%10s %12s %12s %12s %12s' % ('T','transpath','discrete','continuous','max rel err'))
+
+    results = []
+    for T in T_values:
+        t = np.linspace(0,T,samples).round().astype(int)
+
+        def run_transpath():
+            model = solow()
+            model.eval(k0=0.1)
+            with np.errstate(over='ignore'):
+                model.transpath(T=T,t0='FALSE')
+            return model.ktil_trans[t]
+
+        def run_closed_form(method):
+            model = solow()
+            model.eval(k0=0.1)
+            return model.closed_form_path(t,method=method)['ktil']
+
+        # The discrete method is exact and the continuous method is an approximation of the discrete model
+        exact = run_transpath()
+        assert np.array_equal(run_closed_form('discrete'),exact)
+        error = np.max(np.abs(run_closed_form('continuous')/exact-1))
+
+        t_transpath  = best_time(run_transpath)
+        t_discrete   = best_time(lambda: run_closed_form('discrete'))
+        t_continuous = best_time(lambda: run_closed_form('continuous'))
+        print('%10d %12.5f %12.5f %12.5f %12.2e' % (T,t_transpath,t_discrete,t_continuous,error))
+        results.append(dict(T=T,samples=samples,transpath=t_transpath,discrete=t_discrete,continuous=t_continuous,max_rel_error=error))
+
+    return results
+
+
+def bench_tail(T_values=[10**3,10**4,10**5,10**6],tol=1e-12):
+
+    ''' Times transpath with and without steady-state detection (tol).'''
+
+    print('transpath: full recursion vs steady-state tail (tol=%g)' % tol)
+    print('%10s %12s %12s %10s %12s' % ('T','full (s)','tail (s)','converged','max rel err'))
+
+    results = []
+    for T in T_values:
+        def run(tol):
+            model = solow()
+            model.eval(k0=0.1)
+            with np.errstate(over='ignore',invalid='ignore'):
+                model.transpath(T=T,A1=1.5,t0=10,tol=tol)
+            return model
+
+        full,tail = run(None),run(tol)
+        with np.errstate(invalid='ignore'):
+            error = np.nanmax(np.abs(tail.ktil_trans/full.ktil_trans-1))
+
+        t_full = best_time(lambda: run(None))
+        t_tail = best_time(lambda: run(tol))
+        print('%10d %12.5f %12.5f %10s %12.2e' % (T,t_full,t_tail,tail.converged,error))
+        results.append(dict(T=T,tol=tol,full=t_full,tail=t_tail,converged=tail.converged,max_rel_error=error))
+
+    return results
+
+
+def bench_steady_state(calls=10**5,distinct=100,M=10**5):
+
+    ''' Times memoized steady_state lookups for repeated parameter tuples and steady_state_bulk for arrays.'''
+
+    print('steady_state: %d lookups of %d distinct parameter tuples' % (calls,distinct))
+
+    rng = np.random.default_rng(0)
+    grid = [(a,1.0,s,0.04,0.01,0.02) for a,s in zip(rng.uniform(0.2,0.5,distinct),rng.uniform(0.05,0.4,distinct))]
+
+    def run(func):
+        for j in range(calls):
+            func(*grid[j % distinct])
+
+    steady_state.cache_clear()
+    t_cached   = best_time(lambda: run(steady_state),repeat=1)
+    info       = steady_state.cache_info()
+    t_uncached = best_time(lambda: run(steady_state.__wrapped__),repeat=1)
+    print('%12s %12s %8s %10s %10s' % ('cached (s)','uncached (s)','speedup','hits','misses'))
+    print('%12.5f %12.5f %8.1f %10d %10d' % (t_cached,t_uncached,t_uncached/t_cached,info.hits,info.misses))
+
+    # Bulk lookup for arrays of parameters against one lookup per element
+    alpha = rng.uniform(0.2,0.5,M)
+    s     = rng.uniform(0.05,0.4,M)
+    t_bulk = best_time(lambda: steady_state_bulk(alpha,1.0,s,0.04,0.01,0.02))
+    t_loop = best_time(lambda: [steady_state(a,1.0,b,0.04,0.01,0.02) for a,b in zip(alpha.tolist(),s.tolist())],repeat=1)
+    print('%12s %12s %8s' % ('bulk (s)','loop (s)','M'))
+    print('%12.5f %12.5f %8d' % (t_bulk,t_loop,M))
+
+    return dict(calls=calls,distinct=distinct,cached=t_cached,uncached=t_uncached,hits=info.hits,misses=info.misses,M=M,bulk=t_bulk,loop=t_loop)
+
+
+def bench_stochastic(N_values=[10**3,10**4,10**5],T=100):
+
+    ''' Times solow_stochastic.simulate with per-period quantiles for N paths.'''
+
+    print('solow_stochastic.simulate (T=%d)' % T)
+    print('%10s %12s %12s' % ('N','paths (s)','no paths (s)'))
+
+    results = []
+    for N in N_values:
+        def run(keep_paths):
+            model = solow_stochastic()
+            model.simulate(T=T,N=N,seed=0,keep_paths=keep_paths)
+            return model
+
+        t_paths    = best_time(lambda: run(True),repeat=1)
+        t_no_paths = best_time(lambda: run(False),repeat=1)
+        print('%10d %12.5f %12.5f' % (N,t_paths,t_no_paths))
+        results.append(dict(N=N,T=T,paths=t_paths,no_paths=t_no_paths))
+
+    return results
+
+
+animation_scripts = ['increase_tfp','increase_delta','increase_s_toward_golden_rule','solow_animation_increase_s_away_from_golden_rule',
+                     'transition_from_below','transition_to_ss_from_above','stochastic_tfp_fan_chart']
+
+
+def bench_render(scripts=animation_scripts):
+
+    ''' Times the per-frame update (the run callback) and draw (Agg canvas) cost of each animation script, and
+        the draw cost with the static layer blitted from a cache. Nothing is written to disk and ffmpeg is not
+        needed.'''
+
+    print('animation frames on the Agg canvas')
+    print('%50s %8s %10s %12s %10s %10s %8s %8s' % ('script','frames','setup (s)','update (ms)','draw (ms)','blit (ms)','saving','pixels'))
+
+    results = []
+    for script in scripts:
+        start = time.perf_counter()
+        mod = importlib.import_module(script)
+        t_setup = time.perf_counter()-start
+
+        # The first draw also caches fonts and text layout
+        frames = mod.frames
+        mod.fig.canvas.draw()
+        update,draw = np.zeros(len(frames)),np.zeros(len(frames))
+        for j,i in enumerate(frames):
+            start = time.perf_counter()
+            mod.run(i)
+            update[j] = time.perf_counter()-start
+            start = time.perf_counter()
+            mod.fig.canvas.draw()
+            draw[j] = time.perf_counter()-start
+
+        # Full frames as the movie writer grabs them against blitted frames, with the most pixels that differ
+        blit = renderer.blit_savings(renderer.scene(script))
+        plt.close(mod.fig)
+
+        print('%50s %8d %10.5f %12.3f %10.3f %10.3f %7.1fx %8d' % (script,len(frames),t_setup,1000*update.mean(),1000*draw.mean(),
+                                                                1000*blit['blit'],blit['speedup'],blit['max_pixels_differing']))
+        results.append(dict(script=script,frames=len(frames),setup=t_setup,update_mean=update.mean(),update_max=update.max(),
+                            draw_mean=draw.mean(),draw_max=draw.max(),total=update.sum()+draw.sum(),
+                            frame_full=blit['full'],frame_blit=blit['blit'],blit_speedup=blit['speedup'],blit_pixels_differing=blit['max_pixels_differing']))
+
+    return results
+
+
+def flatten(results,prefix=''):
+
+    ''' Returns a dict mapping keys like 'transpath/T=100/array' to the numbers in a results dict.'''
+
+    flat = {}
+    if isinstance(results,dict):
+        labels = [k+'='+str(v) for k,v in results.items() if k in ('T','M','N','script')]
+        head = '/'.join([prefix]+labels) if labels else prefix
+        for k,v in results.items():
+            if k in ('T','M','N','script'):
+                continue
+            flat.update(flatten(v,head+'/'+k if head else k))
+    elif isinstance(results,list):
+        for v in results:
+            flat.update(flatten(v,prefix))
+    elif isinstance(results,(int,float)) and not isinstance(results,bool):
+        flat[prefix] = results
+    return flat
+
+
+def compare(old,new):
+
+    ''' Prints the ratio new/old for every timing found in both sets of results.'''
+
+    print('comparison: %s (%s) vs %s (%s)' % (new['label'],new['time'],old['label'],old['time']))
+    old,new = flatten(old['benchmarks']),flatten(new['benchmarks'])
+    print('%90s %12s %12s %8s' % ('benchmark','old','new','new/old'))
+    for key in sorted(set(old)&set(new)):
+        if old[key]>0 and not key.endswith(('frames','calls','distinct','samples','hits','misses','tol','error','differing')):
+            print('%90s %12.5g %12.5g %8.2f' % (key,old[key],new[key],new[key]/old[key]))
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Benchmarks for solow_model.py and the solow animation scripts.')
+    parser.add_argument('--output',default='benchmark_results.json',help='JSON file for the results')
+    parser.add_argument('--label',default='',help='label stored with the results, e.g. a commit or version')
+    parser.add_argument('--compare',default=None,help='JSON file from an earlier run to compare against')
+    args = parser.parse_args()
+
+    results = dict(label=args.label,
+                   time=datetime.datetime.now().isoformat(timespec='seconds'),
+                   python=platform.python_version(),
+                   numpy=np.__version__,
+                   matplotlib=matplotlib.__version__,
+                   platform=platform.platform(),
+                   benchmarks={})
+
+    benchmarks = results['benchmarks']
+    benchmarks['eval'] = bench_eval()
+    benchmarks['transpath'] = bench_transpath()
+    benchmarks['batch'] = bench_batch()
+    benchmarks['closed_form'] = bench_closed_form()
+    benchmarks['tail'] = bench_tail()
+    benchmarks['steady_state'] = bench_steady_state()
+    benchmarks['stochastic'] = bench_stochastic()
+    benchmarks['render'] = bench_render()
+
+    with open(args.output,'w') as f:
+        json.dump(results,f,indent=2)
+    print('results written to '+args.output)
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            compare(json.load(f),results)
@@ -6,14 +6,11 @@ import matplotlib.animation as animation
 import subprocess
 import os
 from solow_model import solow
+import renderer
 
 plt.style.use('classic')
 plt.rcParams['figure.facecolor'] = 'white'
 
-# Make directories for output if they don't exist
-if not os.path.isdir('../video'):
-    os.mkdir('../video')
-
 ##########################################
 T = 60
 t0 = 10
@@ -22,10 +19,6 @@ model.eval()
 model.transpath(T=T,delta1=0.06,t0=t0)
 ##########################################
 
-# Set up formatting for the movie files
-Writer = animation.writers['ffmpeg']
-writer = Writer(fps=6, metadata=dict(artist='Brian C. Jenkins'), bitrate=1000)
-
 fig = plt.figure(figsize=(16,9))
 ax1 = fig.add_subplot(2, 2, 1)
 ax2 = fig.add_subplot(2, 2, 2)
@@ -64,40 +57,35 @@ ax4.set_title('Investment $i_t$',fontsize=20)
 ax4.text(T-23, 0.1025, 'Created by Brian C. Jenkins',
          fontsize=11, color='black',alpha=0.5)
 
-tme,y,k,c,i= [],[],[],[],[]
-
 
 #############
-z,n=10000,0
-
-def run(*args):
-    global z,n,T,y,k,c,i,tme
-    tme.append(n)
-    k.append(model.ktil_trans[n])
-    y.append(model.ytil_trans[n])
-    c.append(model.ctil_trans[n])
-    i.append(model.itil_trans[n])
-    line11.set_data(tme,k)
-    line12.set_data([tme[-1]],[k[-1]])
-    line21.set_data(tme,y)
-    line22.set_data([tme[-1]],[y[-1]])
-    line31.set_data(tme,c)
-    line32.set_data([tme[-1]],[c[-1]])
-    line41.set_data(tme,i)
-    line42.set_data([tme[-1]],[i[-1]])
-
-    # fig.savefig("%d.png"%z)
-    z+=1
-    if n==T:
-        n=0
-        k=[model.ktil_trans[n]]
-        y=[model.ytil_trans[n]]
-        c=[model.ctil_trans[n]]
-        i=[model.itil_trans[n]]
-        tme=[n]
-    else:
-        n+=1
+def run(n):
+
+    ''' Draws the transition path through period n.'''
+
+    tme = np.arange(n+1)
+    line11.set_data(tme,model.ktil_trans[:n+1])
+    line12.set_data([n],[model.ktil_trans[n]])
+    line21.set_data(tme,model.ytil_trans[:n+1])
+    line22.set_data([n],[model.ytil_trans[n]])
+    line31.set_data(tme,model.ctil_trans[:n+1])
+    line32.set_data([n],[model.ctil_trans[n]])
+    line41.set_data(tme,model.itil_trans[:n+1])
+    line42.set_data([n],[model.itil_trans[n]])
     return line11,line12 ,line21,line22,line31,line32,line41,line42
 
-ani = animation.FuncAnimation(fig, run, T, blit=False,repeat=False,interval=1)#20)
-ani.save('../video/increase_delta.mp4',writer=writer)
+# Periods 1 through T, the frames of the original FuncAnimation whose first call went to the initial draw
+frames = range(1,T+1)
+
+
+if __name__ == '__main__':
+
+    # Make directories for output if they don't exist
+    if not os.path.isdir('../video'):
+        os.mkdir('../video')
+
+    # Set up formatting for the movie files
+    Writer = animation.writers['ffmpeg']
+    writer = Writer(fps=6, metadata=dict(artist='Brian C. Jenkins'), bitrate=1000)
+
+    renderer.render(fig, run, frames, '../video/increase_delta.mp4', writer, cache=True)
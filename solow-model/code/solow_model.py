@@ -3,6 +3,173 @@
 from __future__ import division
 import pylab as py 
 import numpy as np
+import functools
+from collections import namedtuple
+
+# One period of a transition path as yielded by solow.iter_path
+path_record = namedtuple('path_record',['t','ktil','ytil','ctil','itil','E','L'])
+
+# Steady state in per effective worker terms and the golden rule savings rate and steady state
+steady_state_values = namedtuple('steady_state_values',['ktil','ytil','itil','ctil','s_gold','ktil_gold','ytil_gold','ctil_gold'])
+
+
+@functools.lru_cache(maxsize=2**16)
+def steady_state(alpha,A,s,delta,n,g):
+
+    ''' Returns the steady_state_values for scalar parameters. Results are memoized for the most recently used
+    2**16 parameter combinations; steady_state.cache_info() reports hits and misses and steady_state.cache_clear()
+    empties the cache.'''
+
+    return steady_state_bulk(alpha,A,s,delta,n,g)
+
+
+def steady_state_bulk(alpha,A,s,delta,n,g):
+
+    ''' Returns the steady_state_values for parameters that may be arrays. Each field has the broadcast shape
+    of the parameters. Nothing is cached.'''
+
+    ktil      = (s*A/(n+g+delta))**(1/(1-alpha))
+    ytil      = A*ktil**alpha
+    itil      = s*ytil
+    ctil      = (1-s)*ytil
+
+    # Steady state consumption is highest when s = alpha
+    s_gold    = alpha
+    ktil_gold = (s_gold*A/(n+g+delta))**(1/(1-alpha))
+    ytil_gold = A*ktil_gold**alpha
+    ctil_gold = (1-s_gold)*ytil_gold
+
+    return steady_state_values(ktil,ytil,itil,ctil,s_gold,ktil_gold,ytil_gold,ctil_gold)
+
+
+def schedule(values,periods,base):
+
+    ''' Returns an array of per-period values of a parameter for periods 0 through periods-1. values is either a
+    sequence with one entry per period or a piecewise schedule given as a dict {t: value} in which each value
+    applies from period t until the next key. In a piecewise schedule, periods before the first key take the
+    value base. For example, {10: 0.2, 30: 0.1} describes a temporary change in s lasting from period 10 to 29.'''
+
+    path = np.empty((periods,)+np.shape(base))
+    path[:] = base
+
+    if isinstance(values,dict):
+        for t in sorted(values):
+            path[max(t,0):] = values[t]
+    else:
+        values = np.asarray(values,dtype=float)
+        if len(values) != periods:
+            raise ValueError('a parameter schedule must have one value per period (%d), not %d' % (periods,len(values)))
+        path[:] = values.reshape(values.shape+(1,)*(path.ndim-values.ndim))
+
+    return path
+
+
+class lazy_eval:
+
+    ''' Descriptor for a quantity of solow.eval that is computed by the method named group the first time it
+    is accessed after a call to eval. Computed values are kept in the instance's dict cache.'''
+
+    def __init__(self,name,group):
+
+        self.name  = name
+        self.group = group
+
+    def __get__(self,instance,owner=None):
+
+        if instance is None:
+            return self
+        cache = instance.cache
+        if self.name not in cache:
+            getattr(instance,self.group)()
+        return cache[self.name]
+
+
+class lazy_trans:
+
+    ''' Descriptor for a series of a transition path such as ktil_trans that is looked up in the trans dict the
+    first time it is accessed.'''
+
+    def __init__(self,name):
+
+        self.name  = name
+
+    def __get__(self,instance,owner=None):
+
+        if instance is None:
+            return self
+        value = instance.trans[self.name]
+        instance.__dict__[self.name+'_trans'] = value
+        return value
+
+
+# Formulas for the series of a transition path other than ktil, ytil, E, and L
+path_formulas = {
+    'ctil' : lambda p: (1-p.s)*p['ytil'],
+    'itil' : lambda p: p.s*p['ytil'],
+    'k'    : lambda p: p['ktil']*p['E'],
+    'y'    : lambda p: p['ytil']*p['E'],
+    'c'    : lambda p: p['ctil']*p['E'],
+    'i'    : lambda p: p['itil']*p['E'],
+    'K'    : lambda p: p['ktil']*p['E']*p['L'],
+    'Y'    : lambda p: p['ytil']*p['E']*p['L'],
+    'C'    : lambda p: p['ctil']*p['E']*p['L'],
+    'I'    : lambda p: p['itil']*p['E']*p['L'],
+
+    'gktil': lambda p: p.growth(),
+    'gytil': lambda p: p.alpha*p['gktil'],
+    'gctil': lambda p: p.alpha*p['gktil'],
+    'gitil': lambda p: p.alpha*p['gktil'],
+    'gk'   : lambda p: p['gktil']+p.g,
+    'gy'   : lambda p: p.alpha*p['gktil']+p.g,
+    'gc'   : lambda p: p.alpha*p['gktil']+p.g,
+    'gi'   : lambda p: p.alpha*p['gktil']+p.g,
+    'gK'   : lambda p: p['gktil']+p.n+p.g,
+    'gY'   : lambda p: p.alpha*p['gktil']+p.n+p.g,
+    'gC'   : lambda p: p.alpha*p['gktil']+p.n+p.g,
+    'gI'   : lambda p: p.alpha*p['gktil']+p.n+p.g,
+}
+
+# Every series of a transition path
+path_series = ['ktil','ytil','ctil','itil','k','y','c','i','K','Y','C','I','E','L',
+               'gktil','gytil','gctil','gitil','gk','gy','gc','gi','gK','gY','gC','gI']
+
+
+class transition_path(dict):
+
+    ''' Dict of the series of a transition path with time along the last axis. ktil, ytil, E, and L are stored
+    when the path is computed and every other series is computed from them the first time it is looked up.
+    From period tail on, ktil is at its steady state and does not grow.'''
+
+    def __init__(self,ktil,ytil,kpow,E,L,params,alpha,tail=None):
+
+        dict.__init__(self,ktil=ktil,ytil=ytil,E=E,L=L)
+        self.kpow  = kpow
+        self.A     = params['A']
+        self.s     = params['s']
+        self.n     = params['n']
+        self.g     = params['g']
+        self.dep   = params['dep']
+        self.tail  = tail
+
+        # Parameters of solow_batch have shape (M,) and need to broadcast against (M,T+1)
+        self.alpha = np.expand_dims(alpha,-1) if np.ndim(alpha) else alpha
+
+    def __missing__(self,name):
+
+        if name not in path_formulas:
+            raise KeyError(name)
+        self[name] = path_formulas[name](self)
+        return self[name]
+
+    def growth(self):
+
+        ''' Returns the growth rate of ktil.'''
+
+        gktil = self.s*self.A*self.kpow-self.dep
+        if self.tail is not None:
+            gktil[...,self.tail:] = 0
+        return gktil
+
 
 class solow:
 
@@ -16,60 +183,345 @@ class solow:
         self.n       = n
         self.g       = g
 
-        # Compute the steady state values of endogenous variables in ``per effective worker terms''
-        self.ktil_ss = (s*A/(n+g+delta))**(1/(1-alpha))
-        self.ytil_ss = A*self.ktil_ss**alpha
-        self.itil_ss = s*self.ytil_ss
-        self.ctil_ss = (1-s)*self.ytil_ss
+        # Compute the steady state values of endogenous variables in ``per effective worker terms'' and the
+        # golden rule. Scalar parameters are looked up in the steady_state cache.
+        if any(isinstance(x,np.ndarray) for x in [alpha,A,s,delta,n,g]):
+            ss = steady_state_bulk(alpha,A,s,delta,n,g)
+        else:
+            ss = steady_state(alpha,A,s,delta,n,g)
+
+        self.ktil_ss = ss.ktil
+        self.ytil_ss = ss.ytil
+        self.itil_ss = ss.itil
+        self.ctil_ss = ss.ctil
         self.dktil_ss= 0
 
+        self.s_gold    = ss.s_gold
+        self.ktil_gold = ss.ktil_gold
+        self.ytil_gold = ss.ytil_gold
+        self.ctil_gold = ss.ctil_gold
+
     def eval(self,k0='FALSE',E0=1,L0=1):
 
         ''' Evaluates an instance of the Solow model given k0, E0, and L0.'''
 
-        if k0=='FALSE':
+        if isinstance(k0,str) and k0=='FALSE':
             self.ktil = self.ktil_ss
         else:
             self.ktil = k0
 
-        self.ytil = self.A*self.ktil**self.alpha
-        self.ctil = (1-self.s)*self.ytil
-        self.itil = self.s*self.ytil
-        self.dktil= self.s*self.ytil - (self.delta+self.n+self.g)*self.ktil
+        A,s,n,g   = self.A,self.s,self.n,self.g
+        self.ytil = A*self.ktil**self.alpha
+        self.ctil = (1-s)*self.ytil
+        self.itil = s*self.ytil
+        self.dktil= s*self.ytil - (self.delta+n+g)*self.ktil
         self.ktil1= self.ktil+self.dktil
 
-        self.k    = self.ktil*E0
-        self.y    = self.ytil*E0
-        self.i    = self.itil*E0
-        self.c    = self.ctil*E0
+        self.E0   = E0
+        self.L0   = L0
+        self.E1   = (1+g)*E0
+        self.L1   = (1+n)*L0
 
-        self.K    = self.ktil*E0*L0
-        self.Y    = self.ytil*E0*L0
-        self.I    = self.itil*E0*L0
-        self.C    = self.ctil*E0*L0
+        # Levels and growth rates are computed on first access (see lazy_eval) using the parameters in place now
+        self.cache = {'params':(self.alpha,A,s,self.delta,n,g)}
 
-        self.gktil= self.s*self.A*self.ktil**(self.alpha-1)-(self.delta+self.n+self.g)
-        self.gytil= self.alpha*self.gktil
-        self.gctil= self.alpha*self.gktil
-        self.gitil= self.alpha*self.gktil
+    def eval_levels(self):
 
-        self.gk   = self.gktil+self.g
-        self.gy   = self.alpha*self.gktil+self.g
-        self.gc   = self.alpha*self.gktil+self.g
-        self.gi   = self.alpha*self.gktil+self.g
+        ''' Computes the per worker and aggregate quantities of eval.'''
 
-        self.gK   = self.gktil+self.n+self.g
-        self.gY   = self.alpha*self.gktil+self.n+self.g
-        self.gC   = self.alpha*self.gktil+self.n+self.g
-        self.gI   = self.alpha*self.gktil+self.n+self.g
+        cache = self.cache
+        ktil,ytil,itil,ctil,E0,L0 = self.ktil,self.ytil,self.itil,self.ctil,self.E0,self.L0
+        cache['k']    = ktil*E0
+        cache['y']    = ytil*E0
+        cache['i']    = itil*E0
+        cache['c']    = ctil*E0
+
+        cache['K']    = ktil*E0*L0
+        cache['Y']    = ytil*E0*L0
+        cache['I']    = itil*E0*L0
+        cache['C']    = ctil*E0*L0
+
+    def eval_growth(self):
+
+        ''' Computes the growth rates of eval.'''
+
+        cache = self.cache
+        alpha,A,s,delta,n,g = cache['params']
+        gktil = s*A*self.ktil**(alpha-1)-(delta+n+g)
+        cache['gktil']= gktil
+        cache['gytil']= alpha*gktil
+        cache['gctil']= alpha*gktil
+        cache['gitil']= alpha*gktil
+
+        cache['gk']   = gktil+g
+        cache['gy']   = alpha*gktil+g
+        cache['gc']   = alpha*gktil+g
+        cache['gi']   = alpha*gktil+g
+
+        cache['gK']   = gktil+n+g
+        cache['gY']   = alpha*gktil+n+g
+        cache['gC']   = alpha*gktil+n+g
+        cache['gI']   = alpha*gktil+n+g
+
+
+    def transpath(self,t0=5,T=10,A1='FALSE',s1='FALSE',delta1='FALSE',n1='FALSE',g1='FALSE',engine='array',A=None,s=None,delta=None,n=None,g=None,tol=None):
+
+        ''' Computes the transition path of the model for T periods starting from the most recent call to eval.
+        If t0 is not 'FALSE', the first of A1, s1, delta1, n1, or g1 that is not 'FALSE' becomes the new value of
+        the corresponding parameter in period t0.
+
+        Any mix of A, s, delta, n, and g may also be given a time-varying schedule: either an array with one value
+        for each of the T+1 periods or a piecewise schedule {t: value} (see the schedule function). Period 0 is
+        always the most recent call to eval, so the first entry of an array only matters for consistency.
+
+        Results are stored as float64 arrays in the dict self.trans and exposed as the attributes ktil_trans,
+        ytil_trans, etc. Afterwards, the parameters are left at their final-period values. Set engine='list' to
+        use the original list-based implementation.
+
+        If tol is given, the recursion stops once the parameters no longer change and ktil is within a relative
+        distance tol of its steady state. The rest of the horizon is then filled in analytically: ktil stays at
+        the steady state, levels grow with E and L, and growth rates equal g per worker and n+g in aggregate.
+        The period in which the steady state is reached is stored in self.converged (None if it is not).'''
+
+        schedules = {}
+        for name,value in [('A',A),('s',s),('delta',delta),('n',n),('g',g)]:
+            if value is not None:
+                schedules[name] = value
+
+        if engine == 'list':
+            if schedules or tol is not None:
+                raise ValueError('parameter schedules and tol require engine=\'array\'')
+            self.transpath_list(t0=t0,T=T,A1=A1,s1=s1,delta1=delta1,n1=n1,g1=g1)
+            return
+
+        # Number of periods computed before and after the parameter change
+        if t0 == 'FALSE':
+            pre,post = T,0
+        else:
+            pre,post = len(range(t0-1)),len(range(t0-1,T))
+        periods = 1+pre+post
+
+        # Per-period parameter values
+        params = {}
+        for name in ['A','s','delta','n','g']:
+            value = getattr(self,name)
+            params[name] = np.empty((periods,)+np.shape(value))
+            params[name][:] = value
+
+        shock = None
+        for name,value in [('A',A1),('s',s1),('delta',delta1),('n',n1),('g',g1)]:
+            if t0 != 'FALSE' and not (isinstance(value,str) and value=='FALSE'):
+                if name in schedules:
+                    raise ValueError('%s1 and a schedule for %s cannot both be given' % (name,name))
+                params[name][1+pre:] = value
+                shock = (name,value)
+                break
+
+        for name in schedules:
+            params[name] = schedule(schedules[name],periods,getattr(self,name))
+
+        # Period 0 is the most recent call to eval
+        for name,value in zip(['alpha','A','s','delta','n','g'],self.cache['params']):
+            if name in params:
+                params[name][0] = value
+
+        params['dep'] = params['delta']+params['n']+params['g']
+
+        # Iterate on the law of motion for capital. This is the only part that must be done period by period.
+        ktil,ytil,kpow,tail = self.recursion(params,tol=tol)
+        self.converged = tail if tail<periods else None
+
+        # E and L grow at the rates g and n of the previous period
+        E = np.empty_like(ktil)
+        L = np.empty_like(ktil)
+        if periods>1:
+            E[1],L[1] = self.E1,self.L1
+            E[2:] = 1+params['g'][1:-1]
+            L[2:] = 1+params['n'][1:-1]
+            np.cumprod(E[1:],axis=0,out=E[1:])
+            np.cumprod(L[1:],axis=0,out=L[1:])
+
+        ktil[0],ytil[0],kpow[0] = self.ktil,self.ytil,self.ktil**(self.alpha-1)
+        E[0],L[0] = self.E0,self.L0
+
+        # Every other series is computed when it is first accessed. Paths are stored with time along the last axis.
+        self.trans = transition_path(ktil.T,ytil.T,kpow.T,E.T,L.T,{name:params[name].T for name in params},self.alpha,tail=tail)
+        for name in path_series:
+            self.__dict__.pop(name+'_trans',None)
+
+        # Leave the parameters and current values at their final-period values
+        if shock is not None and post>0:
+            setattr(self,shock[0],shock[1])
+        for name in schedules:
+            setattr(self,name,params[name][-1].copy())
+        self.eval(k0=ktil[-1].copy(),E0=E[-1].copy(),L0=L[-1].copy())
+
+
+    def iter_path(self,t0=5,T=None,A1='FALSE',s1='FALSE',delta1='FALSE',n1='FALSE',g1='FALSE',A=None,s=None,delta=None,n=None,g=None):
+
+        ''' Generator version of transpath that yields one path_record (t, ktil, ytil, ctil, itil, E, L) per
+        period, starting with period 0 from the most recent call to eval. Values agree exactly with transpath.
+        If T is None, the path never ends; an array schedule then holds its last value after it runs out.
+        Unlike transpath, the instance is not modified.'''
+
+        schedules = {}
+        for name,value in [('A',A),('s',s),('delta',delta),('n',n),('g',g)]:
+            if value is not None:
+                schedules[name] = value
+
+        # The new parameter value of A1, s1, etc. applies from period t0 on
+        if t0 != 'FALSE':
+            for name,value in [('A',A1),('s',s1),('delta',delta1),('n',n1),('g',g1)]:
+                if not (isinstance(value,str) and value=='FALSE'):
+                    if name in schedules:
+                        raise ValueError('%s1 and a schedule for %s cannot both be given' % (name,name))
+                    schedules[name] = {max(t0,1):value}
+                    break
+
+        # Piecewise schedules are stepped through in order of their keys
+        current = {'A':self.A,'s':self.s,'delta':self.delta,'n':self.n,'g':self.g}
+        changes = {}
+        for name in schedules:
+            if isinstance(schedules[name],dict):
+                changes[name] = sorted(schedules[name].items())
+            else:
+                schedules[name] = np.asarray(schedules[name],dtype=float)
+
+        yield path_record(0,self.ktil,self.ytil,self.ctil,self.itil,self.E0,self.L0)
+
+        alpha = self.alpha
+        kt,Et,Lt = self.ktil1,self.E1,self.L1
+        t = 1
+        while T is None or t<=T:
+            for name in schedules:
+                if name in changes:
+                    while changes[name] and changes[name][0][0]<=t:
+                        current[name] = changes[name].pop(0)[1]
+                else:
+                    current[name] = schedules[name][min(t,len(schedules[name])-1)]
+            A,s,n,g = current['A'],current['s'],current['n'],current['g']
+            dep = current['delta']+n+g
+
+            yt = A*kt**alpha
+            yield path_record(t,kt,yt,(1-s)*yt,s*yt,Et,Lt)
+            kt = kt+(s*yt - dep*kt)
+            Et = (1+g)*Et
+            Lt = (1+n)*Lt
+            t+=1
 
-        self.E0   = E0
-        self.L0   = L0
-        self.E1   = (1+self.g)*E0
-        self.L1   = (1+self.n)*L0
 
+    def closed_form_path(self,t,method='continuous'):
+
+        ''' Evaluates ktil, ytil, ctil, and itil at the times in t without a parameter change, starting from the
+        most recent call to eval. With method='continuous', uses the analytic solution of the continuous-time
+        model:
+
+            ktil(t)**(1-alpha) = ktil_ss**(1-alpha) + (ktil(0)**(1-alpha) - ktil_ss**(1-alpha))*exp(-(1-alpha)*(delta+n+g)*t)
+
+        which costs the same for every t and accepts non-integer times. With method='discrete', iterates the
+        law of motion of transpath up to the largest t using scalar arithmetic only, so the values agree exactly
+        with transpath. Returns a dict of arrays with time along the last axis.'''
+
+        t = np.asarray(t,dtype=float)
+
+        # Parameters get a trailing axis so that solow_batch returns arrays of shape (M,len(t))
+        alpha,A,s = [np.expand_dims(np.asarray(x,dtype=float),-1) for x in [self.alpha,self.A,self.s]]
+        dep  = np.expand_dims(np.asarray(self.delta+self.n+self.g,dtype=float),-1)
+        k0   = np.expand_dims(np.asarray(self.ktil,dtype=float),-1)
+
+        if method == 'continuous':
+            kss  = (s*A/dep)**(1/(1-alpha))
+            ktil = (kss**(1-alpha) + (k0**(1-alpha) - kss**(1-alpha))*np.exp(-(1-alpha)*dep*t))**(1/(1-alpha))
+
+        elif method == 'discrete':
+            if np.any(t<0) or np.any(t!=np.round(t)):
+                raise ValueError('method=\'discrete\' requires non-negative integer times')
+
+            # Scalar models iterate on Python floats exactly like transpath
+            if k0.size == 1:
+                a,Aa,sa,da,kt = alpha.item(),A.item(),s.item(),dep.item(),self.ktil
+            else:
+                a,Aa,sa,da,kt = alpha[...,0],A[...,0],s[...,0],dep[...,0],k0[...,0]
+
+            ktil = np.empty(np.broadcast_shapes(k0.shape,t.shape))
+            step = 0
+            for j in np.argsort(t,kind='stable'):
+                while step<t[j]:
+                    yt = Aa*kt**a
+                    kt = kt+(sa*yt - da*kt)
+                    step+=1
+                ktil[...,j] = kt
+
+        else:
+            raise ValueError('method must be \'continuous\' or \'discrete\'')
+
+        ytil = A*ktil**alpha
+        path = {}
+        path['t']    = t
+        path['ktil'] = ktil
+        path['ytil'] = ytil
+        path['ctil'] = (1-s)*ytil
+        path['itil'] = s*ytil
+
+        return path
+
+
+    def steady_tail(self,params):
+
+        ''' Returns the first period from which the parameters in params stay constant along with the steady
+        state of ktil for the final parameter values.'''
+
+        changed = np.zeros(len(params['A']),dtype=bool)
+        for name in ['A','s','dep']:
+            p = params[name]
+            changed |= (p!=p[-1]).reshape(len(p),-1).any(axis=1)
+        start = np.flatnonzero(changed)[-1]+1 if changed.any() else 0
+
+        A,s,dep = params['A'][-1],params['s'][-1],params['dep'][-1]
+        kss = (s*A/dep)**(1/(1-self.alpha))
+
+        return start,kss
+
+
+    def recursion(self,params,tol=None):
+
+        ''' Iterates on the law of motion for capital per effective worker given per-period parameter arrays.
+        Returns ktil, ytil, and ktil**(alpha-1) for periods 1 and up and the period from which the steady state
+        was filled in (the number of periods if the steady state was not reached within tol).'''
+
+        periods = len(params['A'])
+        ktil  = np.empty(periods)
+        ytil  = np.empty(periods)
+        kpow  = np.empty(periods)
+
+        A_,s_,dep_ = params['A'].tolist(),params['s'].tolist(),params['dep'].tolist()
+        alpha = self.alpha
+        kt = self.ktil1
+
+        if tol is None:
+            start,kss = periods,None
+        else:
+            start,kss = self.steady_tail(params)
+
+        for t in range(1,periods):
+            if t>=start and abs(kt-kss)<=tol*kss:
+                ktil[t:] = kss
+                ytil[t:] = A_[-1]*kss**alpha
+                kpow[t:] = kss**(alpha-1)
+                return ktil,ytil,kpow,t
+            yt = A_[t]*kt**alpha
+            ktil[t] = kt
+            ytil[t] = yt
+            kpow[t] = kt**(alpha-1)
+            kt = kt+(s_[t]*yt - dep_[t]*kt)
+
+        return ktil,ytil,kpow,periods
+
+
+    def transpath_list(self,t0=5,T=10,A1='FALSE',s1='FALSE',delta1='FALSE',n1='FALSE',g1='FALSE'):
+
+        ''' Original list-based implementation of transpath. Kept for validation and benchmarking.'''
 
-    def transpath(self,t0=5,T=10,A1='FALSE',s1='FALSE',delta1='FALSE',n1='FALSE',g1='FALSE'):
         self.ktil_trans= [self.ktil]
         self.ytil_trans= [self.ytil]
         self.ctil_trans= [self.ctil]
@@ -170,4 +622,149 @@ class solow:
 
             else:
                 for k in range(t0-1,T):
-                    trans()
\ No newline at end of file
+                    trans()
+
+
+# Levels and growth rates of eval and series of transpath are computed on first access
+for name in ['k','y','i','c','K','Y','I','C']:
+    setattr(solow,name,lazy_eval(name,'eval_levels'))
+for name in ['gktil','gytil','gctil','gitil','gk','gy','gc','gi','gK','gY','gC','gI']:
+    setattr(solow,name,lazy_eval(name,'eval_growth'))
+for name in path_series:
+    setattr(solow,name+'_trans',lazy_trans(name))
+
+
+class solow_batch(solow):
+
+    ''' Vectorized version of solow for simulating M economies at once. Any of alpha, A, s, delta, n, and g may
+    be an array of shape (M,) and scalars are broadcast. Steady-state values and the results of eval are arrays
+    of shape (M,) and each transition path is an array of shape (M,T+1).'''
+
+    def __init__(self,alpha=0.35,A=1,s=0.1,delta=.04,n=0.01,g=0.02):
+
+        alpha,A,s,delta,n,g = np.broadcast_arrays(*[np.atleast_1d(np.asarray(x,dtype=float)) for x in [alpha,A,s,delta,n,g]])
+        solow.__init__(self,alpha=alpha,A=A,s=s,delta=delta,n=n,g=g)
+        self.M = len(alpha)
+
+    def eval(self,k0='FALSE',E0=1,L0=1):
+
+        ''' Evaluates all M economies given k0, E0, and L0. Each may be a scalar or an array of shape (M,).'''
+
+        if not (isinstance(k0,str) and k0=='FALSE'):
+            k0 = np.broadcast_to(np.asarray(k0,dtype=float),(self.M,)).copy()
+        solow.eval(self,k0=k0,E0=E0,L0=L0)
+
+    def transpath(self,t0=5,T=10,A1='FALSE',s1='FALSE',delta1='FALSE',n1='FALSE',g1='FALSE',A=None,s=None,delta=None,n=None,g=None,tol=None):
+
+        ''' Computes the transition paths of all M economies. The new parameter value may be a scalar or an array
+        of shape (M,), and schedules may have shape (T+1,) or (T+1,M) or be piecewise with values of shape (M,).
+        With tol, the steady state is filled in once every economy is within tol of its steady state.'''
+
+        solow.transpath(self,t0=t0,T=T,A1=A1,s1=s1,delta1=delta1,n1=n1,g1=g1,A=A,s=s,delta=delta,n=n,g=g,tol=tol)
+
+    def recursion(self,params,tol=None):
+
+        ''' Steps the law of motion for capital of all M economies together. Arrays are time-major with shape
+        (T+1,M) so that each step works on contiguous memory.'''
+
+        A,s,dep = params['A'],params['s'],params['dep']
+        periods = len(A)
+        alpha = self.alpha
+
+        ktil  = np.empty((periods,self.M))
+        ytil  = np.empty((periods,self.M))
+        tmp   = np.empty(self.M)
+
+        # Period 0 is filled in by transpath
+        ktil[0] = self.ktil
+        if periods>1:
+            ktil[1] = self.ktil1
+
+        if tol is None:
+            start,kss = periods,None
+        else:
+            start,kss = self.steady_tail(params)
+
+        tail = periods
+        for t in range(1,periods):
+            if t>=start and np.all(np.abs(ktil[t]-kss)<=tol*kss):
+                ktil[t:] = kss
+                ytil[t:] = A[-1]*kss**alpha
+                tail = t
+                break
+            np.power(ktil[t],alpha,out=ytil[t])
+            ytil[t] *= A[t]
+            if t+1<periods:
+                np.multiply(s[t],ytil[t],out=ktil[t+1])
+                np.multiply(dep[t],ktil[t],out=tmp)
+                ktil[t+1] -= tmp
+                ktil[t+1] += ktil[t]
+
+        kpow = ktil**(alpha-1)
+
+        return ktil,ytil,kpow,tail
+
+
+class solow_stochastic(solow):
+
+    ''' Solow model with AR(1) shocks to TFP and the savings rate:
+
+            A_t = A*exp(a_t),   a_t = rhoA*a_{t-1} + sigmaA*e_t
+            s_t = s + x_t,      x_t = rhos*x_{t-1} + sigmas*u_t
+
+    where e_t and u_t are independent standard normal. s_t is kept in [0,1]. simulate draws N paths at once.'''
+
+    def __init__(self,alpha=0.35,A=1,s=0.1,delta=.04,n=0.01,g=0.02,rhoA=0.9,sigmaA=0.02,rhos=0.9,sigmas=0.01):
+
+        solow.__init__(self,alpha=alpha,A=A,s=s,delta=delta,n=n,g=g)
+        self.rhoA   = rhoA
+        self.sigmaA = sigmaA
+        self.rhos   = rhos
+        self.sigmas = sigmas
+
+    def simulate(self,T=100,N=1000,seed=None,k0='FALSE',quantiles=[0.05,0.25,0.5,0.75,0.95],keep_paths=True):
+
+        ''' Simulates N paths of T periods starting from k0 with no shock in period 0. Period t quantiles of
+        ktil, ytil, ctil, and itil across paths are computed as the simulation goes and stored in the dict
+        self.quantiles as arrays of shape (len(quantiles),T+1). If keep_paths is True, the paths themselves are
+        stored in the dict self.paths as arrays of shape (N,T+1); otherwise memory use does not grow with N*T.
+        seed is passed to numpy.random.default_rng.'''
+
+        rng   = np.random.default_rng(seed)
+        alpha = self.alpha
+        dep   = self.delta+self.n+self.g
+        names = ['ktil','ytil','ctil','itil','A','s']
+
+        self.quantile_levels = np.asarray(quantiles,dtype=float)
+        self.quantiles = {name:np.empty((len(quantiles),T+1)) for name in names[:4]}
+        if keep_paths:
+            self.paths = {name:np.empty((T+1,N)) for name in names}
+
+        if isinstance(k0,str) and k0=='FALSE':
+            k0 = self.ktil_ss
+
+        a    = np.zeros(N)
+        x    = np.zeros(N)
+        ktil = np.full(N,k0,dtype=float)
+
+        for t in range(T+1):
+            if t>0:
+                a = self.rhoA*a + self.sigmaA*rng.standard_normal(N)
+                x = self.rhos*x + self.sigmas*rng.standard_normal(N)
+            A_t  = self.A*np.exp(a)
+            s_t  = np.clip(self.s+x,0,1)
+
+            ytil = A_t*ktil**alpha
+            values = {'ktil':ktil,'ytil':ytil,'ctil':(1-s_t)*ytil,'itil':s_t*ytil,'A':A_t,'s':s_t}
+
+            for name in names[:4]:
+                self.quantiles[name][:,t] = np.quantile(values[name],self.quantile_levels)
+            if keep_paths:
+                for name in names:
+                    self.paths[name][t] = values[name]
+
+            ktil = ktil+(values['itil'] - dep*ktil)
+
+        # Paths are stored with time along the last axis like solow_batch
+        if keep_paths:
+            self.paths = {name:self.paths[name].T for name in names}
@@ -0,0 +1,82 @@
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import matplotlib.animation as animation
+import os
+from solow_model import solow_stochastic
+import renderer
+
+plt.style.use('classic')
+plt.rcParams['figure.facecolor'] = 'white'
+
+##########################################
+T = 60
+N = 10000
+model = solow_stochastic(rhoA=0.9,sigmaA=0.02,rhos=0.9,sigmas=0.01)
+model.simulate(T=T,N=N,seed=0,quantiles=[0.05,0.25,0.5,0.75,0.95],keep_paths=False)
+##########################################
+
+fig = plt.figure(figsize=(16,9))
+
+panels = [('ktil','Capital $k_t$'),('ytil','Output $y_t$'),('ctil','Consumption $c_t$'),('itil','Investment $i_t$')]
+tme = np.arange(T+1)
+bands,medians,points = [],[],[]
+
+for j,(name,title) in enumerate(panels):
+    ax = fig.add_subplot(2, 2, j+1)
+    q = model.quantiles[name]
+
+    # Outer band is the 5-95 percentile range and the inner band is the 25-75 percentile range
+    outer = ax.fill_between([], [], [], color='b', alpha=0.15, lw=0)
+    inner = ax.fill_between([], [], [], color='b', alpha=0.3, lw=0)
+    line, = ax.plot([], [], lw=4)
+    point, = ax.plot([], [],'ob',lw=4)
+    ax.grid()
+    margin = 0.1*(np.max(q)-np.min(q))
+    ax.set_ylim(np.min(q)-margin, np.max(q)+margin)
+    ax.set_xlim(0, T)
+    ax.set_title(title,fontsize=20)
+
+    bands.append((outer,inner,q))
+    medians.append(line)
+    points.append(point)
+
+ax.text(T-23, ax.get_ylim()[0]+0.02*(ax.get_ylim()[1]-ax.get_ylim()[0]), 'Created by Brian C. Jenkins',
+         fontsize=11, color='black',alpha=0.5)
+
+
+def band_verts(x,lower,upper):
+
+    ''' Returns the vertices of the polygon between lower and upper.'''
+
+    return np.concatenate([np.column_stack([x,lower]),np.column_stack([x[::-1],upper[::-1]])])
+
+
+def run(n):
+
+    ''' Draws the fan chart through period n.'''
+
+    x = tme[:n+1]
+    for (outer,inner,q),line,point in zip(bands,medians,points):
+        outer.set_verts([band_verts(x,q[0,:n+1],q[4,:n+1])])
+        inner.set_verts([band_verts(x,q[1,:n+1],q[3,:n+1])])
+        line.set_data(x,q[2,:n+1])
+        point.set_data([x[-1]],[q[2,n]])
+
+    return [a for band in bands for a in band[:2]]+medians+points
+
+frames = range(T+1)
+
+
+if __name__ == '__main__':
+
+    # Make directories for output if they don't exist
+    if not os.path.isdir('../video'):
+        os.mkdir('../video')
+
+    # Set up formatting for the movie files
+    Writer = animation.writers['ffmpeg']
+    writer = Writer(fps=6, metadata=dict(artist='Brian C. Jenkins'), bitrate=1000)
+
+    renderer.render(fig, run, frames, '../video/stochastic_tfp_fan_chart.mp4', writer, cache=True)
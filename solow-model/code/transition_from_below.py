@@ -6,14 +6,11 @@ import matplotlib.animation as animation
 import subprocess
 import os
 from solow_model import solow
+import renderer
 
 plt.style.use('classic')
 plt.rcParams['figure.facecolor'] = 'white'
 
-# Make directories for output if they don't exist
-if not os.path.isdir('../video'):
-    os.mkdir('../video')
-    
 ##########################################
 T = 125
 t0 = 10
@@ -28,10 +25,6 @@ sf = model.s*f
 
 ##########################################
 
-# Set up formatting for the movie files
-Writer = animation.writers['ffmpeg']
-writer = Writer(fps=6, metadata=dict(artist='Brian C. Jenkins'), bitrate=1000)
-
 fig = plt.figure(figsize=(16,9))
 ax1 = fig.add_subplot(1, 1, 1)
 ax1.grid()
@@ -46,22 +39,16 @@ ax1.text(20.75, 0.125, 'Created by Brian C. Jenkins',fontsize=11, color='black',
 plt.legend(['Production','Investment','Depreciation'],loc='upper left',fontsize=20)
 ax1.set_title('Transition to the Steady State from Below',fontsize=20)
 
-tme = []
 k = model.ktil_trans
 i = model.itil_trans
 y = model.ytil_trans
 depk= [(model.n+model.delta+model.g)*a for a in k]
 
 #############
-z,n=10000,0
+def run(n):
+
+    ''' Draws capital, investment, output and depreciation in period n.'''
 
-def run(*args):
-    global z,n,T,y,k,i,tme,depk
-    tme=n
-    model.ktil_trans[n]
-    model.ytil_trans[n]
-    model.ctil_trans[n]
-    model.itil_trans[n]
     Y =[depk[n],i[n],y[n]]
     X =[k[n],k[n],k[n]]
     ax1.set_xticks([k[n]])
@@ -75,21 +62,20 @@ def run(*args):
     text ='t=%d' % n
     time_text.set_text(text)
     line11.set_data(X,Y)
+    return line11, time_text, ax1.xaxis, ax1.yaxis
+
+# Periods 1 through T, the frames of the original FuncAnimation whose first call went to the initial draw
+frames = range(1,T+1)
+
+
+if __name__ == '__main__':
+
+    # Make directories for output if they don't exist
+    if not os.path.isdir('../video'):
+        os.mkdir('../video')
 
-    # fig.savefig("%d.png"%z)
-    z+=1
-    if n==T:
-        n=0
-        model.ktil_trans[n]
-        model.ytil_trans[n]
-        model.ctil_trans[n]
-        model.itil_trans[n]
-        Y =[depk[n],i[n],y[n]]
-        X =[k[n],k[n],k[n]]
-        tme=[n]
-    else:
-        n+=1
-    return line11, time_text
+    # Set up formatting for the movie files
+    Writer = animation.writers['ffmpeg']
+    writer = Writer(fps=6, metadata=dict(artist='Brian C. Jenkins'), bitrate=1000)
 
-ani = animation.FuncAnimation(fig, run, T, blit=False,repeat=True,interval=1)
-ani.save('../video/solow_transition_from_below.mp4',writer=writer)
+    renderer.render(fig, run, frames, '../video/solow_transition_from_below.mp4', writer, cache=True)
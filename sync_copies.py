@@ -0,0 +1,62 @@
+# Keeps the shared modules that are copied into the code directory of several animations identical. Each module is
+# edited in its master copy only and copied to the other directories from the root of the repository with:
+#
+#     python sync_copies.py            # copies each master over its copies
+#     python sync_copies.py --check    # lists the copies that differ from their master, exit status 1 if any
+
+import os
+import sys
+import shutil
+import filecmp
+import argparse
+
+root = os.path.dirname(os.path.abspath(__file__))
+
+# Master copy of each shared module and the directories that hold a copy of it
+copies = {'solow-model/code/renderer.py':['banner-video/code','beveridge-curve/code','sargent-phillips-curve/code',
+                                          'signaling/code','yield-curve/code'],
+          'yield-curve/code/benchmark_writer.py':['banner-video/code'],
+          'yield-curve/code/fred_cache.py':['banner-video/code','beveridge-curve/code','sargent-phillips-curve/code']}
+
+
+def pairs():
+
+    ''' Returns the (master,copy) paths of every copy, relative to the root of the repository.'''
+
+    return [(master,os.path.join(directory,os.path.basename(master))) for master,directories in copies.items()
+            for directory in directories]
+
+
+def differing():
+
+    ''' Returns the (master,copy) paths of the copies that are missing or differ from their master.'''
+
+    return [(master,copy) for master,copy in pairs() if not os.path.exists(os.path.join(root,copy))
+            or not filecmp.cmp(os.path.join(root,master),os.path.join(root,copy),shallow=False)]
+
+
+def sync():
+
+    ''' Copies each master over its copies that differ and returns the paths of the copies written.'''
+
+    written = []
+    for master,copy in differing():
+        shutil.copyfile(os.path.join(root,master),os.path.join(root,copy))
+        written.append(copy)
+    return written
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Copies the shared modules to every code directory that uses them, or checks that the copies are identical.')
+    parser.add_argument('--check',action='store_true',help='only list the copies that differ from their master')
+    args = parser.parse_args()
+
+    if args.check:
+        stale = differing()
+        for master,copy in stale:
+            print('%s differs from %s' % (copy,master))
+        sys.exit(1 if stale else 0)
+
+    for copy in sync():
+        print('copied to %s' % copy)
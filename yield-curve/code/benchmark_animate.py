@@ -0,0 +1,130 @@
+# Per-frame cost of the animate function of us_treasury_yield_curve_animation.py. The original animate built a Series
+# with yields.iloc[i] and formatted the date of day i with strftime on every frame. The script now takes row i of a
+# contiguous (N,8) array and a date label formatted for all days at once. Run from this directory:
+#
+#     python benchmark_animate.py [--days N] [--draw-frames M]
+#
+# The data are a synthetic random walk with the length of the daily history since 1965, so no download is needed.
+# The report shows the time of the function alone, over all days, and with a canvas draw, over the first M days,
+# and whether the two versions give identical frames.
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+plt.style.use('classic')
+plt.rcParams['figure.facecolor'] = 'white'
+
+
+def make_figure():
+
+    ''' Returns a figure, line and date text laid out like us_treasury_yield_curve_animation.py.'''
+
+    fig = plt.figure(figsize=(16,9))
+    ax = fig.add_subplot(1, 1, 1)
+    line, = ax.plot([], [], lw=8)
+    ax.grid()
+    ax.set_xlim(0,7)
+    ax.set_ylim(0,18)
+    ax.set_xticks(range(8))
+    ax.set_yticks([2,4,6,8,10,12,14,16,18])
+    ax.set_xticklabels(['1m','3m','6m','1y','5y','10y','20y','30y'],fontsize=20)
+    ax.set_yticklabels([2,4,6,8,10,12,14,16,18],fontsize=20)
+    ax.text(5.75,.25, 'Created by Brian C. Jenkins',fontsize=11, color='black',alpha=0.5)
+    dateText = ax.text(0.975, 16.625, '',fontsize=18,horizontalalignment='right')
+    return fig,line,dateText
+
+
+def per_frame_lookup(yields):
+
+    ''' The original animate: a Series and a formatted date per frame.'''
+
+    fig,line,dateText = make_figure()
+
+    def animate(i):
+        x = [0,1,2,3,4,5,6,7]
+        y = yields.iloc[i]
+        line.set_data(x, y)
+        dateText.set_text(yields.index[i].strftime('%b %d, %Y'))
+        return line ,dateText
+
+    return fig,animate
+
+
+def precomputed(yields):
+
+    ''' The current animate: views of arrays prepared before the first frame.'''
+
+    fig,line,dateText = make_figure()
+    x = np.arange(8)
+    y = np.ascontiguousarray(yields.to_numpy(dtype=float))
+    date_labels = yields.index.strftime('%b %d, %Y').to_numpy()
+
+    def animate(i):
+        line.set_data(x, y[i])
+        dateText.set_text(date_labels[i])
+        return line ,dateText
+
+    return fig,animate
+
+
+def time_frames(fig,animate,frames,draw):
+
+    ''' Returns the seconds spent in animate, and in the canvas draw if draw is True, for each frame, and the RGBA
+        pixels of the last frame.'''
+
+    times = np.zeros(len(frames))
+    fig.canvas.draw()
+    for k,i in enumerate(frames):
+        start = time.perf_counter()
+        animate(i)
+        if draw:
+            fig.canvas.draw()
+        times[k] = time.perf_counter()-start
+    pixels = np.array(fig.canvas.buffer_rgba())
+    return times,pixels
+
+
+def bench_animate(days,draw_frames=250):
+
+    ''' Times both versions of animate over days trading days, alone and with a draw of the first draw_frames.'''
+
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range('1965-01-01',periods=days)
+    levels = np.clip(4+np.cumsum(rng.normal(0,0.05,(days,1)),axis=0)+np.linspace(0,2,8),0.01,17)
+    yields = pd.DataFrame(levels,index=index,columns=['1 mo','3 mo','6 mo','1 yr','5 yr','10 yr','20 yr','30 yr'])
+    yields.iloc[:len(yields)//2,0] = np.nan
+
+    results = {}
+    for label,make in [('per-frame lookup',per_frame_lookup),('precomputed',precomputed)]:
+        fig,animate = make(yields)
+        animate_times,_ = time_frames(fig,animate,range(days),draw=False)
+        draw_times,pixels = time_frames(fig,animate,range(draw_frames),draw=True)
+        results[label] = dict(animate=animate_times,draw=draw_times,pixels=pixels)
+        plt.close(fig)
+
+    old,new = results['per-frame lookup'],results['precomputed']
+    print('animate over %d daily frames (microseconds per frame), and with a draw over %d frames (ms per frame)' % (days,draw_frames))
+    print('%20s %14s %14s %16s' % ('','animate (us)','total (s)','with draw (ms)'))
+    for label,r in results.items():
+        print('%20s %14.1f %14.3f %16.2f' % (label,1e6*r['animate'].mean(),r['animate'].sum(),1000*r['draw'].mean()))
+    print('animate speedup %.1fx; with draw %.2fx; last frames identical: %s' % (old['animate'].sum()/new['animate'].sum(),
+          old['draw'].sum()/new['draw'].sum(),np.array_equal(old['pixels'],new['pixels'])))
+
+    return dict(days=days,animate_per_frame_lookup=old['animate'].sum(),animate_precomputed=new['animate'].sum(),
+                draw_per_frame_lookup=old['draw'].mean(),draw_precomputed=new['draw'].mean())
+
+
+if __name__ == '__main__':
+
+    days = len(pd.bdate_range('1965-01-01',pd.Timestamp.today()))
+    parser = argparse.ArgumentParser(description='Benchmarks animate of the US Treasury yield curve animation.')
+    parser.add_argument('--days',type=int,default=days,help='number of daily frames (default: January 1965 to today)')
+    parser.add_argument('--draw-frames',type=int,default=250,help='frames drawn on the canvas for the timing with a draw')
+    args = parser.parse_args()
+
+    bench_animate(args.days,args.draw_frames)
@@ -0,0 +1,175 @@
+# Time spent downloading the eight Treasury yield series of us_treasury_yield_curve_animation.py one at a time and
+# with a pool of threads. The series come from a local stand-in for the FRED API that serves canned responses after
+# a fixed latency and fails some requests with status 503, so the numbers show the effect of overlapping requests and
+# the retries, and no API key or network access is needed. Run from this directory:
+#
+#     python benchmark_download.py [--latency 0.25] [--fail-every 7] [--workers 1 2 4 8]
+#
+# The canned series have the length of the daily history since 1962. Each mode merges the series into the yields
+# frame with fred_cache.fetch_frame, as the animation script does, and the report shows whether its frame is
+# identical to the serial one.
+#
+# The cache of the first mode is then refreshed three times: with the data unchanged, with a week of new observations
+# and with a revision of a recent DGS10 observation. The report shows the requests and bytes each refresh downloads
+# and whether its frame is identical to a full download of the same data.
+
+import os
+import time
+import json
+import shutil
+import argparse
+import tempfile
+import threading
+import urllib.parse
+import http.server
+import numpy as np
+import pandas as pd
+import fred_cache
+
+series_ids = ['DTB4WK','DTB3','DTB6','DGS1','DGS5','DGS10','DGS20','DGS30']
+names = ['1 mo','3 mo','6 mo','1 yr','5 yr','10 yr','20 yr','30 yr']
+
+
+def canned_responses(series_ids,start='1962-01-02',extra_days=0,last_updated='2026-01-02 15:16:03-06',revised=None):
+
+    ''' Returns a dict of the JSON bodies of the FRED API requests for series_ids, keyed by (path,id), with random
+        walks for observations and '.' for a missing value on holidays. The observations run to extra_days business
+        days after today, and the ones of a longer history start with those of a shorter one. revised is an optional
+        series id whose value 10 days before today is raised by 0.01.'''
+
+    dates = pd.bdate_range(start,pd.Timestamp.today().normalize()+pd.offsets.BDay(extra_days))
+    responses = {('fred/series/release',''):{'releases':[{'id':18,'name':'H.15 Selected Interest Rates'}]},
+                 ('fred/release/sources','18'):{'sources':[{'name':'Board of Governors of the Federal Reserve System (US)'}]}}
+    for k,series_id in enumerate(series_ids):
+        values = np.round(np.abs(4+k/4+np.cumsum(np.random.default_rng([k,0]).normal(0,0.05,len(dates)))),2)
+        holidays = np.random.default_rng([k,1]).random(len(dates))<0.04
+        if series_id==revised:
+            values[len(dates)-extra_days-10] += 0.01
+        observations = [{'date':d,'value':'.' if h else '%.2f' % v} for d,v,h in zip(dates.strftime('%Y-%m-%d'),values,holidays)]
+        responses['fred/series',series_id] = {'seriess':[{'id':series_id,'title':'Market Yield, '+series_id,'frequency':'Daily',
+                                              'frequency_short':'D','units':'Percent','units_short':'%','seasonal_adjustment':'Not Seasonally Adjusted',
+                                              'seasonal_adjustment_short':'NSA','last_updated':last_updated}]}
+        responses['fred/series/observations',series_id] = {'observations':observations}
+    return {key:json.dumps(body).encode() for key,body in responses.items()}
+
+
+class stand_in(http.server.BaseHTTPRequestHandler):
+
+    ''' Request handler of the local FRED API: answers with the canned response of the path and the series or release
+        id after the server's latency, except that every fail_every-th request gets status 503. Observations are
+        limited to the ones from observation_start on.'''
+
+    def do_GET(self):
+
+        server = self.server
+        url = urllib.parse.urlsplit(self.path)
+        query = urllib.parse.parse_qs(url.query)
+        path = url.path.strip('/')
+        key = (path,query.get('release_id',[''])[0] if path=='fred/release/sources' else
+               '' if path=='fred/series/release' else query.get('series_id',[''])[0])
+
+        with server.lock:
+            server.requests += 1
+            fail = server.fail_every and server.requests % server.fail_every==0
+        time.sleep(server.latency)
+
+        if fail:
+            server.failures += 1
+            self.send_error(503)
+        elif key not in server.responses:
+            self.send_error(400,'Bad Request. The series does not exist.')
+        else:
+            body = server.responses[key]
+            if 'observation_start' in query:
+                observations = json.loads(body)['observations']
+                body = json.dumps({'observations':[o for o in observations if o['date']>=query['observation_start'][0]]}).encode()
+            with server.lock:
+                server.sent += len(body)
+            self.send_response(200)
+            self.send_header('Content-Type','application/json')
+            self.send_header('Content-Length',str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self,format,*args):
+
+        pass
+
+
+def serve(responses,latency=0.25,fail_every=0):
+
+    ''' Starts the stand-in on a free local port in a daemon thread and returns the server. Its url attribute is
+        the API address.'''
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1',0),stand_in)
+    server.responses,server.latency,server.fail_every = responses,latency,fail_every
+    server.lock,server.requests,server.failures,server.sent = threading.Lock(),0,0,0
+    server.url = 'http://127.0.0.1:%d/' % server.server_address[1]
+    threading.Thread(target=server.serve_forever,daemon=True).start()
+    return server
+
+
+def bench_download(workers=(1,2,4,8),latency=0.25,fail_every=7,backoff=0.05):
+
+    ''' Downloads the yield series into an empty cache with each number of workers, then refreshes the cache of the
+        first download as the data change. Returns a dict of seconds per number of workers or kind of refresh.'''
+
+    server = serve(canned_responses(series_ids),latency,fail_every)
+    fred_cache.api_url,fred_cache.backoff = server.url,backoff
+    os.environ['FRED_API_KEY'] = 'stand-in'
+
+    def download(directory,n,max_age=fred_cache.day):
+        requests,failures,sent = server.requests,server.failures,server.sent
+        start = time.perf_counter()
+        frame = fred_cache.fetch_frame(series_ids,names,workers=n,max_age=max_age,directory=directory)
+        seconds = time.perf_counter()-start
+        return seconds,(server.requests-requests,server.failures-failures,server.sent-sent),frame
+
+    results,frames,counts = {},{},{}
+    cache = tempfile.mkdtemp()
+    for n in workers:
+        directory = tempfile.mkdtemp()
+        results[n],counts[n],frames[n] = download(directory,n)
+        if n==workers[0]:
+            shutil.rmtree(cache)
+            shutil.move(directory,cache)
+        else:
+            shutil.rmtree(directory)
+
+    # Refresh the first cache as the data change and compare with a full download into an empty cache
+    refreshes = [('unchanged',{}),('a week of new days',dict(extra_days=5,last_updated='2026-01-09 15:16:03-06')),
+                 ('revised DGS10',dict(extra_days=5,last_updated='2026-01-10 15:16:03-06',revised='DGS10'))]
+    refreshed = {}
+    for label,kwargs in refreshes:
+        server.responses = canned_responses(series_ids,**kwargs)
+        seconds,count,frame = download(cache,max(workers),max_age=0)
+        directory = tempfile.mkdtemp()
+        refreshed[label] = seconds,count,frame.equals(download(directory,max(workers))[2])
+        shutil.rmtree(directory)
+    shutil.rmtree(cache)
+    server.shutdown()
+
+    first = workers[0]
+    failing = 'every %d-th request fails' % fail_every if fail_every else 'no failures'
+    print('%d series, %d rows, %.0f ms latency per request, %s' % (len(series_ids),len(frames[first]),1000*latency,failing))
+    print('%10s %10s %10s %10s %10s %10s' % ('workers','total (s)','speedup','requests','retried','identical'))
+    for n,seconds in results.items():
+        print('%10d %10.2f %10.2f %10d %10d %10s' % (n,seconds,results[first]/seconds,counts[n][0],counts[n][1],frames[n].equals(frames[first])))
+    print('%20s %10s %10s %10s %10s' % ('refresh','total (s)','requests','kB','identical'))
+    for label,(seconds,count,identical) in refreshed.items():
+        print('%20s %10.2f %10d %10.0f %10s' % (label,seconds,count[0],count[2]/1000,identical))
+        results[label] = seconds
+
+    return results
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Compares serial and concurrent downloads of the yield curve series from a local stand-in for FRED.')
+    parser.add_argument('--workers',type=int,nargs='+',default=[1,2,4,8],help='numbers of download threads to compare')
+    parser.add_argument('--latency',type=float,default=0.25,help='seconds before the stand-in answers a request')
+    parser.add_argument('--fail-every',type=int,default=7,help='answer every n-th request with status 503 (0: never)')
+    parser.add_argument('--backoff',type=float,default=0.05,help='seconds before the first retry')
+    args = parser.parse_args()
+
+    bench_download(args.workers,args.latency,args.fail_every,args.backoff)
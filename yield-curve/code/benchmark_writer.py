@@ -0,0 +1,63 @@
+# Time spent writing frames to ffmpeg with the movie writer's savefig path and with the raw pipe of renderer.py. The
+# frames are drawn in a single process so the numbers show the cost of getting pixels to the encoder. Run from the
+# directory of the script, e.g.
+#
+#     python benchmark_writer.py us_treasury_yield_curve_animation --func animate --init-func init_func --frames 2000
+#     python benchmark_writer.py banner-animation --func update_plot --fps 60 --bitrate 5000
+#
+# Each mode writes the same movie, and the report shows whether its file is identical to the savefig one.
+
+import os
+import time
+import hashlib
+import argparse
+import tempfile
+import importlib
+import matplotlib.animation as animation
+import renderer
+
+
+def bench_writer(module,func,init_func=None,frames=None,fps=25,bitrate=3000,depth=4):
+
+    ''' Renders the first frames of module with each writer mode and returns a dict of seconds per mode.'''
+
+    mod = importlib.import_module(module)
+    draw = getattr(mod,func)
+    init = None if init_func is None else getattr(mod,init_func)
+    frame_list = list(mod.frames)[:frames]
+
+    modes = [('savefig',{}),('raw, no queue',dict(raw=True,depth=0)),('raw, queue of %d' % depth,dict(raw=True,depth=depth))]
+    results,digests = {},{}
+    tmpdir = tempfile.mkdtemp()
+    for label,kwargs in modes:
+        filename = os.path.join(tmpdir,'benchmark.mp4')
+        writer = animation.writers['ffmpeg'](fps=fps,metadata=dict(artist='Brian C Jenkins'),bitrate=bitrate)
+        start = time.perf_counter()
+        renderer.render(mod.fig,draw,frame_list,filename,writer,processes=1,init_func=init,**kwargs)
+        results[label] = time.perf_counter()-start
+        with open(filename,'rb') as f:
+            digests[label] = hashlib.md5(f.read()).hexdigest()
+        os.remove(filename)
+    os.rmdir(tmpdir)
+
+    print('%s: %d frames' % (module,len(frame_list)))
+    print('%18s %10s %14s %10s %10s' % ('','total (s)','ms per frame','speedup','identical'))
+    for label,seconds in results.items():
+        print('%18s %10.2f %14.2f %10.2f %10s' % (label,seconds,1000*seconds/len(frame_list),results['savefig']/seconds,digests[label]==digests['savefig']))
+
+    return results
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Compares the savefig and raw pipe writers of renderer.py.')
+    parser.add_argument('module',help='animation script without .py')
+    parser.add_argument('--func',default='animate',help='name of the function that draws a frame')
+    parser.add_argument('--init-func',default=None,help='name of a function called before the first frame')
+    parser.add_argument('--frames',type=int,default=None,help='number of frames to render (default: all)')
+    parser.add_argument('--fps',type=int,default=25)
+    parser.add_argument('--bitrate',type=int,default=3000)
+    parser.add_argument('--depth',type=int,default=4,help='frames queued for the writer thread')
+    args = parser.parse_args()
+
+    bench_writer(args.module,args.func,args.init_func,args.frames,args.fps,args.bitrate,args.depth)
@@ -12,12 +12,14 @@
 
 import matplotlib
 matplotlib.use("Agg")
-import fredpy as fp
+import fred_cache
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import os
 import time
+import renderer
 
 plt.style.use('classic')
 plt.rcParams['figure.facecolor'] = 'white'
@@ -44,33 +46,16 @@ file_name = '../video/us_treasury_yield_curve'
 # In[4]:
 
 
-# Download data into Fred objects
-y1m= fp.series('DTB4WK')
-y3m= fp.series('DTB3')
-y6m= fp.series('DTB6')
-y1 = fp.series('DGS1')
-y5 = fp.series('DGS5')
-y10= fp.series('DGS10')
-y20= fp.series('DGS20')
-y30= fp.series('DGS30')
-
-# Give the series names
-y1m.data.name = '1 mo'
-y3m.data.name = '3 mo'
-y6m.data.name = '6 mo'
-y1.data.name = '1 yr'
-y5.data.name = '5 yr'
-y10.data.name = '10 yr'
-y20.data.name = '20 yr'
-y30.data.name = '30 yr'
+# Download the eight series at once, or read them from the cache in ../.fred-cache when they were downloaded less
+# than a day ago, and merge them into one DataFrame with a named column per maturity
+yields = fred_cache.fetch_frame(['DTB4WK','DTB3','DTB6','DGS1','DGS5','DGS10','DGS20','DGS30'],
+                                ['1 mo','3 mo','6 mo','1 yr','5 yr','10 yr','20 yr','30 yr'],workers=8)
 
 
 # In[5]:
 
 
-yields = pd.concat([y1m.data,y3m.data,y6m.data,y1.data,y5.data,y10.data,y20.data,y30.data],axis=1)
 yields = yields.loc[start_date:end_date]
-yields = yields.dropna(thresh=1)
 N = len(yields.index)
 print('Date range: '+yields.index[0].strftime('%b %d, %Y')+' to '+yields.index[-1].strftime('%b %d, %Y'))
 
@@ -126,57 +111,66 @@ def init_func():
 # In[8]:
 
 
+# The yields of all days as one contiguous (N,8) array and their dates formatted in one pass, so that the animation
+# function only takes a row of the array and a label instead of building a Series and formatting a date every frame
+x = np.arange(8)
+y = np.ascontiguousarray(yields.to_numpy(dtype=float))
+date_labels = yields.index.strftime('%b %d, %Y').to_numpy()
+
 # The animation function
 def animate(i):
-    global yields
-    x = [0,1,2,3,4,5,6,7]
-    y = yields.iloc[i]
-    line.set_data(x, y)
-    dateText.set_text(yields.index[i].strftime('%b %d, %Y'))
+    line.set_data(x, y[i])
+    dateText.set_text(date_labels[i])
     return line ,dateText
 
+# One frame per trading day
+frames = range(N)
 
-# In[9]:
+# Frame i shows only the date and yields of day i, so these identify it when new days are appended to the movie
+keys = list(zip(yields.index.strftime('%Y-%m-%d'),y))
 
 
-# Make directories for output if they don't exist
-if not os.path.isdir('../video'):
-    os.mkdir('../video')
+# In[9]:
+
 
+if __name__ == '__main__':
 
-# In[10]:
+    # Make directories for output if they don't exist
+    if not os.path.isdir('../video'):
+        os.mkdir('../video')
 
 
-# Set up the writer
-Writer = animation.writers['ffmpeg']
-writer = Writer(fps=25, metadata=dict(artist='Brian C Jenkins'), bitrate=3000)
+    # In[10]:
 
-# Make the animation
-anim = animation.FuncAnimation(fig, animate, init_func=init_func,frames=N, interval=20, blit=True)
 
+    # Set up the writer
+    Writer = animation.writers['ffmpeg']
+    writer = Writer(fps=25, metadata=dict(artist='Brian C Jenkins'), bitrate=3000)
 
-# In[11]:
 
+    # In[11]:
 
-# Save the animation as .mp4
-anim.save(file_name+'.mp4', writer = writer)
 
+    # Render the frames in parallel and save the animation as .mp4. If the last movie's days are unchanged, only the
+    # new days are rendered and appended to it. Segments are cached in ../video/.render-cache, so an interrupted run
+    # picks up where it stopped and a full render redraws only the segments whose frames changed
+    renderer.render_appending(fig, animate, frames, keys, file_name+'.mp4', writer, init_func=init_func, cache=True)
 
-# In[ ]:
 
+    # In[ ]:
 
-# Convert the .mp4 to .ogv
-# os.system('ffmpeg -i '+file_name+'.mp4 -acodec libvorbis -ac 2 -ab 128k -ar 44100 -b:v 1800k  '+file_name+'.ogv')
 
+    # Also write the .ogv from the same frames, without a transcode pass, with this writer
+    # writer = renderer.multi_writer([renderer.rendition(file_name+'.ogv',bitrate=1800)], fps=25, metadata=dict(artist='Brian C Jenkins'), bitrate=3000)
 
-# ## Print Time to Run
 
-# In[ ]:
+    # ## Print Time to Run
 
+    # In[ ]:
 
-# Print runtime
-seconds = time.time() - start_time
-m, s = divmod(seconds, 60)
-h, m = divmod(m, 60)
-print("%dh %02dm %02ds"% (h, m, s))
 
+    # Print runtime
+    seconds = time.time() - start_time
+    m, s = divmod(seconds, 60)
+    h, m = divmod(m, 60)
+    print("%dh %02dm %02ds"% (h, m, s))